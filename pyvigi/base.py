@@ -11,6 +11,9 @@
 # constants, methods and classes are imported individually
 # this allows to identify clearly the packages usage
 
+# from standard packages:
+from collections import OrderedDict
+
 # from wxpython: https://www.wxpython.org/
 
 # classes
@@ -28,16 +31,40 @@ from wx import RESIZE_BORDER        as wxRESIZE_BORDER
 from wx import MAXIMIZE_BOX         as wxMAXIMIZE_BOX
 
 # wx bitmap methods
-from wx import PaintDC as wxPaintDC
+from wx import AutoBufferedPaintDC  as wxAutoBufferedPaintDC
+from wx import MemoryDC             as wxMemoryDC
+from wx import NullBitmap           as wxNullBitmap
+from wx import Brush                as wxBrush
+from wx import TRANSPARENT_PEN      as wxTRANSPARENT_PEN
+from wx import Rect                 as wxRect
+from wx import RegionIterator       as wxRegionIterator
+from wx import BG_STYLE_PAINT       as wxBG_STYLE_PAINT
+from wx import Bitmap               as wxBitmap
+from wx import Size                 as wxSize
 
 # wx event constants
 from wx import EVT_PAINT            as wxEVT_PAINT
 from wx import EVT_KEY_DOWN         as wxEVT_KEY_DOWN
 from wx import WXK_ESCAPE           as wxWXK_ESCAPE
 from wx import EVT_ERASE_BACKGROUND as wxEVT_ERASE_BACKGROUND
+from wx import EVT_LEFT_DOWN        as wxEVT_LEFT_DOWN
+from wx import EVT_LEFT_DCLICK      as wxEVT_LEFT_DCLICK
+from wx import EVT_LEFT_UP          as wxEVT_LEFT_UP
+from wx import EVT_MOTION           as wxEVT_MOTION
+from wx import EVT_MOUSEWHEEL       as wxEVT_MOUSEWHEEL
+from wx import EVT_LEAVE_WINDOW     as wxEVT_LEAVE_WINDOW
+
+# wx region constants
+from wx import OutRegion            as wxOutRegion
 
 # wx system
 from wx import Exit                 as wxExit
+from wx import GetApp               as wxGetApp
+from wx import Timer                as wxTimer
+
+# from this package
+from pyvigi.theme import imageBitmap
+from pyvigi.theme import imagePreload
 
 """ 
     
@@ -56,6 +83,264 @@ from wx import Exit                 as wxExit
 
 """
 
+# Refresh scheduler:
+
+# Controls do not refresh immediately when their value
+# is set. They are marked dirty instead and all the dirty
+# controls are refreshed together once per frame (at most
+# "rate" times per second) by a single one-shot timer
+# started by the first dirty mark. A control set many
+# times between two frames is painted only once.
+
+# default frame rate (Hz)
+_FRAME_RATE = 60
+
+class _refreshScheduler(wxTimer):
+
+    def __init__(self, rate):
+        wxTimer.__init__(self)
+        self.SetRate(rate)
+        # dirty entries are "key":(control, callback)
+        self.dirty = {}
+        # statistics
+        self.requests = 0   # refresh requests received
+        self.refreshes = 0  # refreshes performed
+        self.frames = 0     # frames flushed
+        return
+
+    def SetRate(self, rate):
+        self.interval = max(1, int(1000/rate))
+        return
+
+    def Mark(self, key, control, callback):
+        self.requests += 1
+        # a key is only recorded once per frame
+        self.dirty[key] = control, callback
+        # start the frame timer
+        if not self.IsRunning():
+            self.StartOnce(self.interval)
+        return
+
+    # flush the dirty entries (called by the timer)
+    def Notify(self):
+        dirty, self.dirty = self.dirty, {}
+        self.frames += 1
+        for control, callback in dirty.values():
+            # skip destroyed controls
+            if not control: continue
+            callback()
+            self.refreshes += 1
+        return
+
+    def Stats(self):
+        return {
+            "requests"  : self.requests,
+            "refreshes" : self.refreshes,
+            "saved"     : self.requests - self.refreshes,
+            "frames"    : self.frames,
+            }
+
+# the scheduler is created with the first request
+# (a timer can only be created once the app exists)
+_SCHEDULER = None
+
+def _scheduler():
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        if wxGetApp() is None: return None
+        _SCHEDULER = _refreshScheduler(_FRAME_RATE)
+    return _SCHEDULER
+
+# set the frame rate of the refresh scheduler
+def frameRate(rate):
+    global _FRAME_RATE
+    _FRAME_RATE = rate
+    if _SCHEDULER: _SCHEDULER.SetRate(rate)
+    return
+
+# call "callback" on the next frame (once per key)
+def scheduleCall(key, control, callback):
+    s = _scheduler()
+    # no app running: call immediately
+    if s is None: callback()
+    else: s.Mark(key, control, callback)
+    return
+
+# refresh a control on the next frame
+def scheduleRefresh(control):
+    scheduleCall(id(control), control, control.Refresh)
+    return
+
+# get the refresh scheduler statistics
+def refreshStats():
+    s = _scheduler()
+    if s is None: return None
+    return s.Stats()
+
+# Background drawing:
+
+# Backgrounds are either a bitmap (or an image handle)
+# or a tiledBitmap. Only the rectangles of the update
+# region of the window are drawn.
+
+# Tiled backgrounds are used for very large layouts: the
+# background is divided into fixed size tiles that are
+# only rendered (from the layout) when they are drawn.
+# The least recently drawn tiles are dropped when the
+# number of tiles exceeds the budget and are rendered
+# again when required.
+
+class tiledBitmap():
+
+    def __init__(
+        self,
+        width,              # background width
+        height,             # background height
+        render,             # render(dc, rect) draws the rect area
+        tile = 512,         # tiles size
+        budget = 64):       # maximum number of tiles kept
+
+        # parameters
+        self.w, self.h = width, height
+        self.render = render
+        self.tile = tile
+        self.budget = budget
+
+        # rendered tiles "(i, j)":bitmap, the
+        # most recently used tile is last
+        self.tiles = OrderedDict()
+
+        # done
+        return
+
+    def GetSize(self):
+        return wxSize(self.w, self.h)
+
+    def IsOk(self):
+        return True
+
+    # get the area covered by a tile
+    def _TileRect(self, i, j):
+        T = self.tile
+        x, y = i*T, j*T
+        return wxRect(x, y, min(T, self.w-x), min(T, self.h-y))
+
+    # get a tile (render it if necessary)
+    def _Tile(self, i, j):
+        key = i, j
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+        # render the tile area
+        r = self._TileRect(i, j)
+        bm = wxBitmap(r.width, r.height)
+        dc = wxMemoryDC()
+        dc.SelectObject(bm)
+        dc.SetDeviceOrigin(-r.x, -r.y)
+        self.render(dc, r)
+        dc.SelectObject(wxNullBitmap)
+        # record and respect budget
+        self.tiles[key] = bm
+        while len(self.tiles) > self.budget:
+            self.tiles.popitem(last = False)
+        return bm
+
+    # draw the area "rect" of the background at (x, y)
+    def DrawRect(self, dc, rect, x, y):
+        T = self.tile
+        r = rect.Intersect(wxRect(0, 0, self.w, self.h))
+        if r.IsEmpty(): return
+        src = wxMemoryDC()
+        for j in range(r.y//T, (r.y+r.height-1)//T+1):
+            for i in range(r.x//T, (r.x+r.width-1)//T+1):
+                t = r.Intersect(self._TileRect(i, j))
+                if t.IsEmpty(): continue
+                src.SelectObjectAsSource(self._Tile(i, j))
+                dc.Blit(x + t.x - rect.x, y + t.y - rect.y,
+                    t.width, t.height, src, t.x - i*T, t.y - j*T)
+                src.SelectObject(wxNullBitmap)
+        return
+
+    # drop the tiles intersecting "rect" (all tiles if None)
+    # they are rendered again when next drawn
+    def Invalidate(self, rect = None):
+        for key in list(self.tiles.keys()):
+            if rect is None or rect.Intersects(self._TileRect(*key)):
+                del self.tiles[key]
+        return
+
+    # drop the tiles farther than "margin" from "rect"
+    def Evict(self, rect, margin = 0):
+        r = wxRect(rect).Inflate(margin, margin)
+        for key in list(self.tiles.keys()):
+            if not r.Intersects(self._TileRect(*key)):
+                del self.tiles[key]
+        return
+
+# get the rectangles of a region
+def _regionRects(region):
+    rects = []
+    i = wxRegionIterator(region)
+    while i.HaveRects():
+        rects.append(i.GetRect())
+        i.Next()
+    return rects
+
+# draw the rectangles of the update region of "window"
+# using "background" (None, bitmap, handle or tiledBitmap)
+# "origin" is the position in the background of the top
+# left corner of the window (used by scrolled windows)
+def drawBackground(dc, window, background, region, origin = (0, 0)):
+
+    # get the rectangles to draw
+    rects = _regionRects(region)
+    X, Y = origin
+
+    # clear the areas not covered by the background
+    W, H = 0, 0
+    if background:
+        W, H = background.GetSize()
+    dc.SetPen(wxTRANSPARENT_PEN)
+    dc.SetBrush(wxBrush(window.GetBackgroundColour()))
+    for r in rects:
+        if (r.x+X < 0 or r.y+Y < 0
+            or r.GetRight()+X >= W or r.GetBottom()+Y >= H):
+            dc.DrawRectangle(r)
+
+    # nothing else to draw
+    if not background: return
+
+    # tiled background
+    if isinstance(background, tiledBitmap):
+        for r in rects:
+            background.DrawRect(dc,
+                wxRect(r.x+X, r.y+Y, r.width, r.height), r.x, r.y)
+        return
+
+    # scaled variant: draw clipped to each rectangle
+    s = window.GetContentScaleFactor()
+    if s != 1.0:
+        bm = imageBitmap(background, s)
+        for r in rects:
+            dc.SetClippingRegion(r)
+            dc.DrawBitmap(bm, -X, -Y)
+            dc.DestroyClippingRegion()
+        return
+
+    # copy the rectangles from the background
+    src = wxMemoryDC()
+    src.SelectObjectAsSource(imageBitmap(background))
+    for r in rects:
+        r = wxRect(r.x+X, r.y+Y, r.width, r.height)
+        r = r.Intersect(wxRect(0, 0, W, H))
+        if r.IsEmpty(): continue
+        x, y, w, h = r.Get()
+        dc.Blit(x-X, y-Y, w, h, src, x, y)
+    src.SelectObject(wxNullBitmap)
+
+    # done
+    return
+
 # Quick Panel
 class _basePanel(wxPanel):
 
@@ -73,10 +358,30 @@ class _basePanel(wxPanel):
         # BackgroundBitmaps are used to draw decors
         self.BackgroundBitmap = None
 
+        # windowless controls painted by the panel
+        # (see windowless.py) in the order of the list
+        self.Widgets = []
+
+        # widgets under the mouse and pressed
+        self.hover = None
+        self.pressed = None
+
+        # the panel paints all its area itself
+        # (required by the buffered paint dc)
+        self.SetBackgroundStyle(wxBG_STYLE_PAINT)
+
         # bind paint event
         # self.Bind(wxEVT_ERASE_BACKGROUND, self._onEraseBackground)
         self.Bind(wxEVT_PAINT, self._OnPaint)
 
+        # bind mouse events (routed to the widgets)
+        self.Bind(wxEVT_LEFT_DOWN,      self._OnMouseDown)
+        self.Bind(wxEVT_LEFT_DCLICK,    self._OnMouseDown)
+        self.Bind(wxEVT_LEFT_UP,        self._OnMouseUp)
+        self.Bind(wxEVT_MOTION,         self._OnMotion)
+        self.Bind(wxEVT_MOUSEWHEEL,     self._OnMouseWheel)
+        self.Bind(wxEVT_LEAVE_WINDOW,   self._OnMouseLeave)
+
         # done
         return
 
@@ -86,18 +391,84 @@ class _basePanel(wxPanel):
 
     def _OnPaint(self, event):
 
-        # re-draw BackgroundBitmap if defined
-        if self.BackgroundBitmap: 
+        # the buffered dc is only an extra buffer on the
+        # platforms that do not double buffer natively
+        dc = wxAutoBufferedPaintDC(self)
+
+        # re-draw the invalidated parts of the background
+        region = self.GetUpdateRegion()
+        drawBackground(dc, self, self.BackgroundBitmap, region)
 
-            # "DCPaint" is used here.
-            # maybe "BufferedPaintDC" should be used instead.
-            # todo: explore documentation
-            dc = wxPaintDC(self)
-            dc.DrawBitmap(self.BackgroundBitmap, 0, 0)
+        # draw the widgets found in the update region
+        for w in self.Widgets:
+            if not w.shown: continue
+            if region.Contains(w.GetRect()) == wxOutRegion: continue
+            w.Draw(dc)
 
         #done
         return
 
+    # windowless controls
+
+    def AddWidget(self, widget):
+        self.Widgets.append(widget)
+        return
+
+    def RemoveWidget(self, widget):
+        if widget in self.Widgets:
+            self.Widgets.remove(widget)
+        if self.hover is widget: self.hover = None
+        if self.pressed is widget: self.pressed = None
+        return
+
+    # find the top widget under the position (x, y)
+    def _WidgetAt(self, position):
+        x, y = position
+        for w in reversed(self.Widgets):
+            if w.shown and w.HitTest(x, y):
+                return w
+        return None
+
+    # update the widget under the mouse
+    def _Hover(self, event):
+        w = self._WidgetAt(event.GetPosition())
+        if w is not self.hover:
+            if self.hover: self.hover._onMouseLeave(event)
+            self.hover = w
+            if w: w._onMouseEnter(event)
+        return w
+
+    def _OnMouseDown(self, event):
+        w = self._Hover(event)
+        self.pressed = w
+        if w: w._onMouseDown(event)
+        else: event.Skip()
+        return
+
+    def _OnMouseUp(self, event):
+        w = self._Hover(event)
+        self.pressed = None
+        if w: w._onMouseUp(event)
+        else: event.Skip()
+        return
+
+    def _OnMotion(self, event):
+        self._Hover(event)
+        event.Skip()
+        return
+
+    def _OnMouseWheel(self, event):
+        w = self._Hover(event)
+        if w: w._onMouseWheel(event)
+        else: event.Skip()
+        return
+
+    def _OnMouseLeave(self, event):
+        if self.hover: self.hover._onMouseLeave(event)
+        self.hover = None
+        event.Skip()
+        return
+
 # Quick Frame
 class _baseFrm(wxFrame):
 
@@ -131,6 +502,12 @@ _ESCAPE = True
 # Quick App
 class app(wxApp):
 
+    # Preload is a list of sheet names (or the path of
+    # a manifest file listing the names) to be decoded
+    # in parallel before the user's start up code runs.
+    # It is to be overloaded by the user
+    Preload = None
+
     def OnInit(self):
         # create reference to App
         # self.App = self (most likely useless)
@@ -138,6 +515,9 @@ class app(wxApp):
         self.Frame = _baseFrm()     
         # create reference to Panel
         self.Panel = self.Frame.Panel
+        # decode the theme sheets in advance
+        if self.Preload:
+            imagePreload(self.Preload)
         # call user's start up code
         self.Start()
         # adjust widow size to BackgroundBitmap size
@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+# file: bundle.py
+# content: packed theme bundle format
+# created: 2026 October 18
+# modified:
+# modification:
+# author: roch schanen
+# repository: https://github.com/RochSchanen/pyvigi_dev
+# comment:
+
+# constants, methods and classes are imported individually
+# this allows to identify clearly the packages usage
+
+# from standard packages:
+from os import scandir
+from os.path import isfile              as osisfile
+from os.path import getmtime            as osgetmtime
+from io import BytesIO
+from json import dumps                  as jsondumps
+from json import loads                  as jsonloads
+from struct import pack                 as structpack
+from struct import unpack_from          as structunpack
+from mmap import mmap
+from mmap import ACCESS_READ            as mmapACCESS_READ
+
+# from wxpython: https://www.wxpython.org/
+
+# wx bitmap methods
+from wx import Bitmap                   as wxBitmap
+from wx import Image                    as wxImage
+from wx import BITMAP_TYPE_PNG          as wxBITMAP_TYPE_PNG
+
+# from this package
+from pyvigi.theme import _parsepngs
+from pyvigi.theme import _tagindex
+
+"""
+
+    A bundle packs all the sheets of a resources
+    directory into a single file: the png data, the
+    compiled definition files (geometry and tags) and
+    optionally the decoded RGBA pixels of each sheet.
+
+    Build a bundle with:
+
+        bundleBuild("resources", "theme.pvb", rgba = True)
+
+    or from the command line:
+
+        python3 -m pyvigi.bundle resources theme.pvb [--rgba]
+
+    and load it with theme.loadBundle("theme.pvb"). The
+    bundle file is memory mapped: loading a theme only
+    opens one file and, when the RGBA data is present,
+    no png decoding is performed.
+
+    file layout:
+
+        magic   8 bytes     b"PYVIGIB1"
+        size    4 bytes     table size (little endian)
+        table   size bytes  json table (utf-8)
+        data    ...         png and rgba blocks
+
+    the table is {name: sheet} where each sheet is
+
+        {"size": [w, h],
+         "png": [offset, length],
+         "rgba": [offset, length] or None,
+         "library": [[geometry, tags], ...]}
+
+    offsets are counted from the start of the file.
+
+"""
+
+_MAGIC = b"PYVIGIB1"
+
+# data blocks alignment
+_ALIGN = 16
+
+############################################ BUILD
+
+# decode a png file into RGBA bytes
+def _decodergba(filepath):
+
+    img = wxImage(filepath, wxBITMAP_TYPE_PNG)
+    w, h = img.GetSize()
+
+    # convert a mask into an alpha channel
+    if not img.HasAlpha(): img.InitAlpha()
+
+    # interleave the rgb and alpha planes
+    rgb, alpha = bytes(img.GetData()), bytes(img.GetAlpha())
+    rgba = bytearray(4*w*h)
+    rgba[0::4] = rgb[0::3]
+    rgba[1::4] = rgb[1::3]
+    rgba[2::4] = rgb[2::3]
+    rgba[3::4] = alpha
+
+    # done
+    return (w, h), bytes(rgba)
+
+# read the size of a png file from its header
+def _pngsize(data):
+    w, h = structunpack(">II", data, 16)
+    return w, h
+
+def bundleBuild(directory, filepath, rgba = False):
+
+    # collect the sheets: all the png files of the
+    # directory, with their definition file when present
+    names = sorted(
+        e.name[:-4] for e in scandir(directory)
+        if e.is_file() and e.name.endswith(".png"))
+
+    table, blocks, offset = {}, [], 0
+
+    # blocks offsets are first computed relative
+    # to the data section (the table size is not
+    # known yet)
+    def add(data):
+        nonlocal offset
+        start = offset
+        blocks.append(data)
+        offset += len(data)
+        # pad to alignment
+        pad = -offset % _ALIGN
+        if pad:
+            blocks.append(bytes(pad))
+            offset += pad
+        return [start, len(data)]
+
+    for name in names:
+
+        # png data
+        fp = f"{directory}/{name}.png"
+        with open(fp, 'rb') as f:
+            png = f.read()
+
+        # definition file
+        library = []
+        if osisfile(f"{fp}.txt"):
+            library = _parsepngs(f"{fp}.txt")
+
+        # record sheet
+        sheet = {
+            "size"    : list(_pngsize(png)),
+            "png"     : add(png),
+            "rgba"    : None,
+            "library" : [[geometry, list(tags)]
+                for geometry, tags in library],
+            }
+
+        # pre-decoded pixels
+        if rgba:
+            size, data = _decodergba(fp)
+            sheet["size"] = list(size)
+            sheet["rgba"] = add(data)
+
+        table[name] = sheet
+
+    # the data section starts after the table: fix the
+    # offsets until the table size is stable (the offsets
+    # are part of the table)
+    base = 0
+    while True:
+        for sheet in table.values():
+            for k in ["png", "rgba"]:
+                if sheet[k]: sheet[k][0] += base
+        text = jsondumps(table).encode("utf-8")
+        start = len(_MAGIC) + 4 + len(text)
+        start += -start % _ALIGN
+        if start == base: break
+        # undo and try again with the new base
+        for sheet in table.values():
+            for k in ["png", "rgba"]:
+                if sheet[k]: sheet[k][0] -= base
+        base = start
+
+    # write bundle
+    with open(filepath, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(structpack("<I", len(text)))
+        f.write(text)
+        f.write(bytes(base - len(_MAGIC) - 4 - len(text)))
+        for b in blocks:
+            f.write(b)
+
+    # done
+    return
+
+############################################ LOAD
+
+class themeBundle():
+
+    def __init__(self, filepath):
+
+        # parameters
+        self.filepath = filepath
+        self.stamp = osgetmtime(filepath)
+
+        # map the bundle file
+        with open(filepath, 'rb') as f:
+            self.map = mmap(f.fileno(), 0, access = mmapACCESS_READ)
+
+        # check format
+        if self.map[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{filepath} is not a pyvigi bundle")
+
+        # read table
+        n, = structunpack("<I", self.map, len(_MAGIC))
+        start = len(_MAGIC) + 4
+        self.table = jsonloads(self.map[start:start+n].decode("utf-8"))
+
+        # compiled libraries (built on demand)
+        self.libraries = {}
+
+        # done
+        return
+
+    def Names(self):
+        return list(self.table.keys())
+
+    def Has(self, name):
+        return name in self.table
+
+    # key used by the theme cache for this sheet
+    def Key(self, name):
+        return f"{self.filepath}#{name}", self.stamp
+
+    # get the compiled library and its tags index
+    def Library(self, name):
+        if name not in self.libraries:
+            library = []
+            for geometry, tags in self.table[name]["library"]:
+                # restore the tuples of the compiled format
+                geometry = tuple(tuple(g) for g in geometry)
+                library.append((geometry, tuple(tags)))
+            tagindex = _tagindex([t for g, t in library])
+            self.libraries[name] = library, tagindex
+        return self.libraries[name]
+
+    # check for decoded pixels
+    def HasPixels(self, name):
+        return bool(self.table[name]["rgba"])
+
+    # decode the png data of a sheet
+    # (the decoding can be done from a worker thread)
+    def Image(self, name):
+        offset, length = self.table[name]["png"]
+        data = BytesIO(self.map[offset:offset+length])
+        return wxImage(data, wxBITMAP_TYPE_PNG)
+
+    # get the native bitmap of a sheet
+    def Bitmap(self, name):
+        sheet = self.table[name]
+        w, h = sheet["size"]
+
+        # use the decoded pixels
+        if sheet["rgba"]:
+            offset, length = sheet["rgba"]
+            data = memoryview(self.map)[offset:offset+length]
+            return wxBitmap.FromBufferRGBA(w, h, data)
+
+        # decode the png data
+        return wxBitmap(self.Image(name))
+
+if __name__ == "__main__":
+
+    from pyvigi.tools import header
+    header()
+
+    from sys import version
+    print(f"run Python version {version.split(' ')[0]}")
+
+    from pyvigi import version
+    print(f"using pyvigi version {version}")
+
+    from sys import argv
+
+    # python3 -m pyvigi.bundle directory filepath [--rgba]
+    args = [a for a in argv[1:] if not a.startswith("--")]
+    if len(args) != 2:
+        print("usage: bundle.py directory filepath [--rgba]")
+
+    else:
+        # the wx image handlers are required to decode png
+        if "--rgba" in argv:
+            from wx import App as wxApp
+            a = wxApp()
+
+        directory, filepath = args
+        bundleBuild(directory, filepath, "--rgba" in argv)
+
+        b = themeBundle(filepath)
+        for n in b.Names():
+            print(f"{' ':3}{n} {b.table[n]['size']}")
@@ -27,6 +27,7 @@ from wx.lib.newevent import NewEvent as wxNewEvent
 
 # from pyvigi:
 from pyvigi.display import bitmapControl
+from pyvigi.base import scheduleRefresh
 
 """
 
@@ -116,7 +117,10 @@ class _btn(bitmapControl):
 
 # to do: integration in a radio group
 
-class Switch(_btn):
+# The behaviour of the buttons is shared with the
+# windowless buttons (see windowless.py)
+
+class _switchBehaviour():
 
     def _onMouseDown(self, event):
         event.Skip() # allow focus events
@@ -125,6 +129,9 @@ class Switch(_btn):
         self.SendEvent()
         return
 
+class Switch(_switchBehaviour, _btn):
+    pass
+
 # #################################################### LED SWITCH
 
 # set and cleared alternatively on mouse up
@@ -141,13 +148,7 @@ class Switch(_btn):
 # 2 = off pressed
 # 3 = on  pressed
 
-class LEDSwitch(_btn):
-
-    def _start(self):
-        self.lock = False
-        self.Bind(wxEVT_LEFT_UP, self._onMouseUp)
-        self.Bind(wxEVT_LEAVE_WINDOW, self._onMouseLeave)
-        return
+class _ledSwitchBehaviour():
 
     def _onMouseDown(self, event):
         event.Skip() # allow focus events
@@ -182,51 +183,34 @@ class LEDSwitch(_btn):
             self.SendEvent()
         return
 
-    def SetValue(self, Value):
-        self.status = Value
-        self.Refresh()
+class LEDSwitch(_ledSwitchBehaviour, _btn):
+
+    def _start(self):
+        self.lock = False
+        self.Bind(wxEVT_LEFT_UP, self._onMouseUp)
+        self.Bind(wxEVT_LEAVE_WINDOW, self._onMouseLeave)
         return
 
 # #################################################### WHEEL
 
 # a full explanation is necessary here
 
-class Wheel(bitmapControl):
+class _wheelBehaviour():
 
-    def __init__(
-        self,
-        parent,
-        images,
-        hover = None):
-
-        # concatenate hover images
-        if hover:
-            images += hover
-            self.hover = True
-        else:
-            self.hover = False
+    # concatenate the hover images
+    def _HoverImages(self, images, hover):
+        self.hover = bool(hover)
+        if hover: images = images + hover
+        return images
 
-        bitmapControl.__init__(
-            self,
-            parent = parent,
-            images = images,
-            names  = None)
-        
-        # LOCALS
+    # setup the wheel locals ("n" images in total)
+    def _WheelStart(self, n):
         self.rotation = +1    # direction
         self.reset = None     # cancel operation
-        self.radio = None     # radio group handle
-        self.ctr   = None     # control parent
-        self.evt   = None     # event handler
         self.overflow = 0     # overflow flag
-        self.n = len(images)  # full cycle number
+        self.n = n            # full cycle number
         if self.hover:        # subtract hover images
             self.n >>= 1 
-        
-        # BINDINGS
-        self.Bind(wxEVT_ENTER_WINDOW, self._onMouseEnter)
-        self.Bind(wxEVT_LEAVE_WINDOW, self._onMouseLeave)
-        self.Bind(wxEVT_MOUSEWHEEL,   self._onMouseWheel)
         return
 
     def _onMouseEnter(self, event):
@@ -287,12 +271,15 @@ class Wheel(bitmapControl):
         # get value
         m = int(Value)
         # upgrade to hover
-        if self.status > self.n:
+        if self.status >= self.n:
             m += self.n
         # update
-        self.status = m
         self.reset  = m
-        self.Refresh()
+        self.status = m
+        # always refreshed (on the next frame): the wheel
+        # handler commits the position already written in
+        # status by _onMouseWheel() and not yet painted
+        scheduleRefresh(self)
         return
 
     def GetValue(self):
@@ -303,6 +290,35 @@ class Wheel(bitmapControl):
         # self.Refresh()
         return
 
+class Wheel(_wheelBehaviour, bitmapControl):
+
+    def __init__(
+        self,
+        parent,
+        images,
+        hover = None):
+
+        # concatenate hover images
+        images = self._HoverImages(images, hover)
+
+        bitmapControl.__init__(
+            self,
+            parent = parent,
+            images = images,
+            names  = None)
+        
+        # LOCALS
+        self._WheelStart(len(images))
+        self.radio = None     # radio group handle
+        self.ctr   = None     # control parent
+        self.evt   = None     # event handler
+        
+        # BINDINGS
+        self.Bind(wxEVT_ENTER_WINDOW, self._onMouseEnter)
+        self.Bind(wxEVT_LEAVE_WINDOW, self._onMouseLeave)
+        self.Bind(wxEVT_MOUSEWHEEL,   self._onMouseWheel)
+        return
+
     # Bind the event to the parent handler
     def BindEvent(self, handler):
         # "handler" is a reference to the handler method
@@ -43,6 +43,10 @@ from wx import EVT_MOUSEWHEEL   as wxEVT_MOUSEWHEEL
 from wx import PostEvent as wxPostEvent
 from wx.lib.newevent import NewEvent as wxNewEvent
 
+# from this package
+from pyvigi.base import drawBackground
+from pyvigi.base import scheduleCall
+
 class Control(wxControl):
 
     def __init__(
@@ -104,7 +108,10 @@ class Control(wxControl):
     def _onPaint(self, event):
         if self.BackgroundBitmap:
             dc = wxBufferedPaintDC(self)
-            dc.DrawBitmap(self.BackgroundBitmap, 0, 0)
+            # draw the update region only (large
+            # backgrounds may be tiled bitmaps)
+            drawBackground(dc, self,
+                self.BackgroundBitmap, self.GetUpdateRegion())
         return
 
     def BindEvent(self, handler):
@@ -120,6 +127,24 @@ class Control(wxControl):
             wxPostEvent(self.GetParent(), event)
         return
 
+# The vScroll control scrolls its content vertically
+# (mouse drag and mouse wheel). By default, the control
+# has the size of its content and is moved inside the
+# frame. In viewport mode (see SetViewportHeight) the
+# control keeps the size of the frame container and
+# records a scroll offset: the pixels already drawn are
+# scrolled and only the newly exposed strip is painted.
+# In viewport mode, the scroll requests are applied
+# once per frame (see base.scheduleCall).
+
+# Rows: the content of a vScroll can be described as a
+# list of rows of equal height (see SetRows) created by
+# a factory. Only the rows found in the viewport (plus
+# "overscan" rows above and below) have a control; the
+# controls of the rows leaving that window are recycled
+# for the rows entering it. The values of all the rows
+# are kept in a plain list: the data model.
+
 class vScroll(Control):
 
     def Start(self):
@@ -129,6 +154,17 @@ class vScroll(Control):
         self.rotation = 50
         # setup scroll value boundaries
         self.extr = 0, 0
+        # viewport mode
+        self.viewport = False
+        self.offset = 0     # current scroll offset
+        self.target = 0     # requested scroll offset
+        # rows (see SetRows)
+        self.factory = None
+        self.rowwidth = 0   # width of the row controls
+        self.default = None # value of the rows without value
+        self.model = []     # row values
+        self.rows = {}      # row index: control
+        self.pool = []      # unused controls
         # bind events
         self.Bind(wxEVT_LEFT_DOWN,      self._LeftDown)
         self.Bind(wxEVT_MOTION,         self._Motion)
@@ -150,12 +186,16 @@ class vScroll(Control):
         dQ = 0
         # take no action if mouse locked
         if self.lock: return
-        # get initial locations
-        P, Q = self.GetPosition()
         # get wheel action
         r = event.GetWheelRotation()
         if r > 0: dQ = +self.rotation
         if r < 0: dQ = -self.rotation
+        # viewport: move the offset the opposite way
+        if self.viewport:
+            self._ScrollTo(self.target - dQ)
+            return
+        # get initial locations
+        P, Q = self.GetPosition()
         # compute new control position
         p, q = P, Q + dQ
         # get extrema         
@@ -180,11 +220,178 @@ class vScroll(Control):
         # done
         return
 
+    # content height: the background and the rows
+    def _ContentHeight(self):
+        h = 0
+        if self.BackgroundBitmap:
+            w, h = self.BackgroundBitmap.GetSize()
+        if self.factory:
+            h = max(h, len(self.model)*self.rowheight)
+        return h
+
+    # content width: the background and the rows
+    # (the control width when there is no content)
+    def _ContentWidth(self):
+        w = 0
+        if self.BackgroundBitmap:
+            w, h = self.BackgroundBitmap.GetSize()
+        if self.factory:
+            w = max(w, self.rowwidth)
+        if not w:
+            w, h = self.GetSize()
+        return w
+
+    # switch to the viewport mode: the control takes
+    # the size of the frame container
+    def SetViewportHeight(self, height):
+        # get content size
+        w = self._ContentWidth()
+        h = self._ContentHeight()
+        # coerce (a content not yet defined is ignored)
+        if h and height > h: height = h
+        # resize frame and control
+        self.Parent.Parent.SetClientSize((w, height))
+        self.SetPosition((0, 0))
+        self.SetSize((w, height))
+        # setup offset boundaries
+        self.viewport = True
+        self.extr = 0, max(0, h - height)
+        self.offset, self.target = 0, 0
+        self._UpdateRows()
+        self.Refresh()
+        # done
+        return
+
+    # describe the content as rows of equal height:
+    # factory(parent) returns a new row control (that
+    # has the SetValue/GetValue/SetPosition methods).
+    # The rows require the viewport mode: the control
+    # is switched to it (call SetViewportHeight() to
+    # set the viewport height)
+    def SetRows(
+        self,
+        factory,            # row controls factory
+        count,              # number of rows
+        height,             # row height
+        overscan = 2,       # extra rows around the viewport
+        values = None,      # initial values of the rows
+        default = None):    # value of the rows without value
+
+        # destroy previous rows
+        for c in list(self.rows.values()) + self.pool:
+            c.Destroy()
+        self.rows, self.pool = {}, []
+
+        # parameters
+        self.factory = factory
+        self.rowheight = height
+        self.overscan = overscan
+
+        # data model
+        if values is None: self.model = [None]*count
+        else: self.model = list(values)
+
+        # probe row: gives the rows width and the
+        # value shown by the rows without value (by
+        # default, the value of a new row control)
+        c = factory(self)
+        c.Hide()
+        self.pool.append(c)
+        self.rowwidth, h = c.GetSize()
+        if default is None:
+            default = c.GetValue()
+        self.default = default
+
+        # switch to (or update) the viewport mode: this
+        # sets the rows width and the scroll boundaries
+        # and creates the visible rows
+        w, H = self.GetSize()
+        self.SetViewportHeight(H)
+        return
+
+    def SetRowValue(self, i, value):
+        self.model[i] = value
+        if i in self.rows:
+            self.rows[i].SetValue(value)
+        return
+
+    def GetRowValue(self, i):
+        # the control holds the latest value
+        if i in self.rows:
+            self.model[i] = self.rows[i].GetValue()
+        return self.model[i]
+
+    # bind the rows in or near the viewport to controls
+    def _UpdateRows(self):
+        if not self.factory: return
+        # rows window
+        w, H = self.GetSize()
+        h = self.rowheight
+        first = max(0, self.offset//h - self.overscan)
+        last = min(len(self.model), (self.offset+H)//h + 1 + self.overscan)
+        # release the rows leaving the window
+        for i in [i for i in self.rows if not first <= i < last]:
+            c = self.rows.pop(i)
+            # save the value of the control
+            self.model[i] = c.GetValue()
+            c.Hide()
+            self.pool.append(c)
+        # bind the rows entering the window
+        for i in range(first, last):
+            if i in self.rows: continue
+            if self.pool: c = self.pool.pop()
+            else: c = self.factory(self)
+            c.row = i
+            c.SetPosition((0, i*h - self.offset))
+            # always reset the value: a recycled
+            # control shows its previous row value
+            value = self.model[i]
+            if value is None: value = self.default
+            c.SetValue(value)
+            c.Show()
+            self.rows[i] = c
+        # destroy the controls in excess
+        while len(self.pool) > last - first:
+            self.pool.pop().Destroy()
+        return
+
+    # request a new scroll offset (applied on the next frame)
+    def _ScrollTo(self, offset):
+        # coerce to constraints
+        MIN, MAX = self.extr
+        if offset < MIN: offset = MIN
+        if offset > MAX: offset = MAX
+        self.target = int(offset)
+        # coalesce requests until the next frame
+        scheduleCall((id(self), "scroll"), self, self._ApplyScroll)
+        return
+
+    def _ApplyScroll(self):
+        dy = self.target - self.offset
+        if not dy: return
+        self.offset = self.target
+        # scroll the pixels (and the children) and
+        # invalidate the newly exposed strip only
+        self.ScrollWindow(0, -dy)
+        # recycle the rows
+        self._UpdateRows()
+        return
+
+    def _onPaint(self, event):
+        if not self.viewport:
+            Control._onPaint(self, event)
+            return
+        dc = wxBufferedPaintDC(self)
+        drawBackground(dc, self, self.BackgroundBitmap,
+            self.GetUpdateRegion(), (0, self.offset))
+        return
+
     def _LeftDown(self, event):
         # activate locking
         self.lock = True  
-        # record initial control position      
-        self.spos = self.GetPosition()
+        # record initial control position (or offset)
+        if self.viewport: self.spos = (0, self.target)
+        else: self.spos = self.GetPosition()
         # record initial mouse location
         self.mpos = wxGetMousePosition()
         # done
@@ -198,6 +405,10 @@ class vScroll(Control):
             P, Q = self.spos
             # get current mouse position
             x, y = wxGetMousePosition()
+            # viewport: the content follows the mouse
+            if self.viewport:
+                self._ScrollTo(Q - (y-Y))
+                return
             # compute new control position
             p, q = P, Q + y-Y
             # get extrema
@@ -245,7 +456,7 @@ if __name__ == "__main__":
 
             v = vScroll(self.Panel)
             v.SetBackground(imageCollect("bkgd"))
-            v.SetFrameContainerHeight(350)
+            v.SetViewportHeight(350)
 
             # Don't use any "Frame.Panel.BackgroundBitmap"
             # when using the vscroll control. This would
@@ -26,6 +26,11 @@ from wx import DefaultValidator     as wxDefaultValidator
 # wx bitmap methods
 from wx import Bitmap               as wxBitmap
 from wx import BufferedPaintDC      as wxBufferedPaintDC
+from wx import MemoryDC             as wxMemoryDC
+from wx import NullBitmap           as wxNullBitmap
+from wx import Brush                as wxBrush
+from wx import TRANSPARENT_PEN      as wxTRANSPARENT_PEN
+from wx import Rect                 as wxRect
 
 # wx event constants
 from wx import EVT_ERASE_BACKGROUND as wxEVT_ERASE_BACKGROUND
@@ -33,6 +38,12 @@ from wx import EVT_PAINT            as wxEVT_PAINT
 
 # from this package 
 from pyvigi.controls import Control
+from pyvigi.theme import imageHandle
+from pyvigi.theme import imageBitmap
+from pyvigi.theme import imageAtlas
+from pyvigi.theme import atlasDraw
+from pyvigi.base import scheduleRefresh
+from pyvigi.base import scheduleCall
 
 ################################################################# BITMAPCONTROL
 
@@ -48,29 +59,19 @@ collection.
 
 """
 
-class bitmapControl(wxControl):
+# The image states are shared by the bitmap control
+# and by the windowless bitmap (see windowless.py)
 
-    def __init__(
-        self,
-        parent,
-        images,
-        names = None):
+class _imageStates():
 
-        wxControl.__init__(
-            self,
-            parent      = parent,
-            id          = wxID_ANY,
-            pos         = wxDefaultPosition,
-            size        = wxDefaultSize,
-            style       = wxNO_BORDER,
-            validator   = wxDefaultValidator,
-            name        = "")
+    # setup images, names and status
+    # and return the size of the biggest image
+    def _SetImages(self, images, names):
 
-        # parameters
-        self.parent = parent
+        self.names  = None
 
         # a single image
-        if  isinstance(images, wxBitmap):
+        if  isinstance(images, (wxBitmap, imageHandle)):
             self.images = [images]
 
             # with a single name
@@ -88,17 +89,92 @@ class bitmapControl(wxControl):
             self.images = images.Values()
             self.names  = images.Keys()
 
+        # name to index map (the first
+        # occurence of a name is used)
+        self.indices = {}
+        if self.names:
+            for i, n in enumerate(self.names):
+                self.indices.setdefault(n, i)
+
         # status is a pointer to an image
         # its value is a string or a integer
         # default value is zero: the first image
         self.status = 0
 
+        # count of SetValue() calls that did
+        # not change the image displayed
+        self.suppressed = 0
+
+        # when all the images come from the same sheet
+        # the images are drawn directly from the sheet
+        # (see theme.imageAtlas)
+        self.atlas = imageAtlas(self.images)
+
         # get size from biggest images
         W, H = 0, 0
         for i in self.images:
             w, h = i.GetSize()
             W, H = max(W, w), max(H, h)
 
+        # done
+        return W, H
+
+    # get the index of the image pointed by a status value
+    def _Index(self, v):
+        if isinstance(v, str):
+            if v not in self.indices:
+                raise ValueError(f"'{v}' is not an image name")
+            return self.indices[v]
+        if not -len(self.images) <= v < len(self.images):
+            raise IndexError(f"image index {v} out of range")
+        return v % len(self.images)
+
+    # draw the current image at (x, y)
+    def _DrawStatus(self, dc, x, y, scale):
+        n = self._Index(self.status)
+        # use the variant matching the display scale
+        if self.atlas and scale == 1.0:
+            atlasDraw(dc, self.atlas, n, x, y)
+        else:
+            dc.DrawBitmap(imageBitmap(self.images[n], scale), x, y)
+        return
+
+    # update status and return True if a refresh is required
+    def _SetStatus(self, Value):
+        # check value
+        n = self._Index(Value)
+        # no change of image: no refresh
+        if n == self._Index(self.status):
+            self.status = Value
+            self.suppressed += 1
+            return False
+        self.status = Value
+        return True
+
+class bitmapControl(wxControl, _imageStates):
+
+    def __init__(
+        self,
+        parent,
+        images,
+        names = None):
+
+        wxControl.__init__(
+            self,
+            parent      = parent,
+            id          = wxID_ANY,
+            pos         = wxDefaultPosition,
+            size        = wxDefaultSize,
+            style       = wxNO_BORDER,
+            validator   = wxDefaultValidator,
+            name        = "")
+
+        # parameters
+        self.parent = parent
+
+        # images and status
+        W, H = self._SetImages(images, names)
+
         # set control size
         self.SetSize((W, H))
 
@@ -114,16 +190,14 @@ class bitmapControl(wxControl):
         pass
 
     def _onPaint(self, event):
-        v = self.status
-        if isinstance(v, int): n = v
-        if isinstance(v, str): n = self.names.index(v)
         dc = wxBufferedPaintDC(self)
-        dc.DrawBitmap(self.images[n], 0, 0)
+        self._DrawStatus(dc, 0, 0, self.GetContentScaleFactor())
         return
 
     def SetValue(self, Value):
-        self.status = Value
-        self.Refresh()
+        # refreshed on the next frame
+        if self._SetStatus(Value):
+            scheduleRefresh(self)
         return
 
     def GetValue(self):
@@ -190,6 +264,124 @@ class digitalFixedPointDisplay(Control):
     def GetValue(self):
         return self.value
 
+######################################################## DIGITALFIXEDPOINTCANVAS
+
+# The canvas version of the digital display draws all the
+# characters into a single control: the glyphs are drawn
+# into a back buffer and only the cells of the characters
+# that changed are drawn again and refreshed. The cells
+# geometry is the same as for the digitalFixedPointDisplay
+# (the widths are given by the images of the characters
+# of the format at value zero).
+
+class digitalFixedPointCanvas(wxControl):
+
+    def __init__(
+        self, 
+        parent,         # parent
+        FORMAT,         # display format
+        imgs,           # digits and symbols images
+        names):         # digits and symbols names
+
+        wxControl.__init__(
+            self,
+            parent      = parent,
+            id          = wxID_ANY,
+            pos         = wxDefaultPosition,
+            size        = wxDefaultSize,
+            style       = wxNO_BORDER,
+            validator   = wxDefaultValidator,
+            name        = "")
+
+        # parameters
+        self.parent = parent
+        self.FORMAT = FORMAT
+        self.images = imgs
+        self.names  = names
+
+        # name to image map
+        self.glyphs = dict(zip(names, imgs))
+
+        # status is a list of image names,
+        # one name for each digit and the dot
+        self.value  = 0
+        self.status = list(f"{0:{FORMAT}}")
+
+        # cells geometry (position, width)
+        self.cells, X, H = [], 0, 0
+        for s in self.status:
+            w, h = self.glyphs[s].GetSize()
+            self.cells.append((X, w))
+            # find maximum height
+            if H < h: H = h
+            # accumulate/inncrement position
+            X += w
+
+        # set control size
+        self.SetSize((X, H))
+
+        # create back buffer
+        self.buffer = wxBitmap(X, H)
+        self.H = H
+
+        # characters drawn in the buffer
+        self.drawn = [None]*len(self.cells)
+        self._DrawCells(self.status)
+
+        # bindings
+        self.Bind(wxEVT_ERASE_BACKGROUND, self._onEraseBackground)
+        self.Bind(wxEVT_PAINT, self._onPaint)
+
+        # done
+        return
+
+    # draw the characters that changed into the buffer
+    # and return the list of the modified cells
+    def _DrawCells(self, status):
+        changed = []
+        dc = wxMemoryDC()
+        dc.SelectObject(self.buffer)
+        dc.SetPen(wxTRANSPARENT_PEN)
+        dc.SetBrush(wxBrush(self.GetBackgroundColour()))
+        for i, s in enumerate(status[:len(self.cells)]):
+            if s == self.drawn[i]: continue
+            x, w = self.cells[i]
+            # clip to the cell
+            dc.SetClippingRegion(x, 0, w, self.H)
+            dc.DrawRectangle(x, 0, w, self.H)
+            dc.DrawBitmap(imageBitmap(self.glyphs[s]), x, 0)
+            dc.DestroyClippingRegion()
+            self.drawn[i] = s
+            changed.append(i)
+        dc.SelectObject(wxNullBitmap)
+        return changed
+
+    def _onEraseBackground(self, event):
+        # force bypass to avoid flicker
+        pass
+
+    def _onPaint(self, event):
+        # copy the back buffer (limited to the update region)
+        dc = wxBufferedPaintDC(self, self.buffer)
+        return
+
+    def SetValue(self, value):
+        self.value = value
+        self.status = list(f"{value:{self.FORMAT}}")
+        # the cells are drawn on the next frame
+        scheduleCall(id(self), self, self._Flush)
+        return
+
+    def _Flush(self):
+        # refresh the modified cells only
+        for i in self._DrawCells(self.status):
+            x, w = self.cells[i]
+            self.RefreshRect(wxRect(x, 0, w, self.H), False)
+        return
+
+    def GetValue(self):
+        return self.value
+
 if __name__ == "__main__":
 
     from pyvigi.tools import header
@@ -230,6 +422,12 @@ if __name__ == "__main__":
             d.SetPosition((30, 30))
             d.SetValue(12.35)
 
+            # same display drawn on a single canvas
+            self.c = digitalFixedPointCanvas(
+                self.Panel, "+06.2f", images, names)
+            self.c.SetPosition((30, 70))
+            self.c.SetValue(12.35)
+
             # add a led to the panel
             LEDS = imageCollect("leds", "green")
             self.b = bitmapControl(self.Panel, imageSelect(LEDS))
@@ -245,6 +443,8 @@ if __name__ == "__main__":
         def update(self, event):
             # inverse led state
             self.b.SetValue(self.b.GetValue()^1)
+            # count on the canvas display
+            self.c.SetValue(self.c.GetValue() + 0.01)
             return
 
     # instanciate myapp
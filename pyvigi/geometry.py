@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+# file: geometry.py
+# content: headless layout solver
+# created: 2026 October 18
+# modified:
+# modification:
+# author: roch schanen
+# repository: https://github.com/RochSchanen/pyvigi_dev
+# comment:
+
+# constants, methods and classes are imported individually
+# this allows to identify clearly the packages usage
+
+# this module does not use wxpython: layouts can be
+# computed (and checked) without any display server.
+
+# numpy is optional (see layoutArray)
+try:
+    from numpy import array as nparray
+except ImportError:
+    nparray = None
+
+"""
+
+    The geometry solver computes the positions and sizes
+    of all the items of a layout tree in one pass. It
+    implements the rules of layout.Group: the Group class
+    builds the tree, calls the solver and applies the
+    results to its items.
+
+    The tree is made of layoutNode objects. Each node has
+    a direction, a minimum size and a list of children.
+    Each child is described by a tuple:
+
+        (item, align, border, deco)
+
+    where "item" is either a layoutNode (a sub-group) or
+    the size (w, h) of a plain item, "border" is the
+    (left, right, top, bottom) border around the item
+    and "deco" is the (left, right, top, bottom) geometry
+    of the decoration around the item (None when there is
+    no decoration).
+
+    solveLayout(tree, (x, y)) returns the list of the
+    rectangles (x, y, w, h) of the nodes and items in
+    pre-order: the root first, then each child followed
+    by its own content. layoutArray() returns the same
+    rectangles as a numpy array when numpy is installed.
+    nodeSize(node) returns the size of a single node.
+
+"""
+
+# constants declaration
+
+# options constants can be combined
+# (some combinaison may be contradictory: avoid them)
+_opt = 1
+
+# directions
+HORIZONTAL  = _opt; _opt<<=1
+VERTICAL    = _opt; _opt<<=1
+
+# alignments
+CENTER      = _opt; _opt<<=1
+LEFT        = _opt; _opt<<=1
+RIGHT       = _opt; _opt<<=1
+TOP         = _opt; _opt<<=1
+BOTTOM      = _opt; _opt<<=1
+
+class layoutNode():
+
+    __slots__ = ["direction", "w", "h", "children"]
+
+    def __init__(
+            self,
+            direction = HORIZONTAL,   # orientation of the group
+            w         = 10,           # minimum width of the group
+            h         = 10,           # minimum height of the group
+            children  = None):        # list of (item, align, border, deco)
+        self.direction = direction
+        self.w, self.h = w, h
+        self.children = children if children is not None else []
+        return
+
+    def Add(self, item, align = CENTER, border = (0, 0, 0, 0), deco = None):
+        self.children.append((item, align, border, deco))
+        return
+
+# flatten the tree in pre-order. "sizes" receives the
+# size of the plain items (None for the groups) and
+# "groups" receives (index, node, children) in post-order
+# where children is a list of (index, align, border, deco)
+def _flatten(node, sizes, groups):
+    index = len(sizes)
+    sizes.append(None)
+    children = []
+    for item, align, border, deco in node.children:
+        if isinstance(item, layoutNode):
+            i = _flatten(item, sizes, groups)
+        else:
+            i = len(sizes)
+            sizes.append(tuple(item))
+        children.append((i, align, border, deco))
+    groups.append((index, node, children))
+    return index
+
+# compute the size of a group from the size of its items
+# (layout.Group.GetSize uses it through nodeSize)
+def _groupSize(node, children, sizes):
+    W, H = 0, 0
+    for i, align, border, deco in children:
+        w, h = sizes[i]
+        l, r, t, b = border
+        L, R, T, B = deco or (0, 0, 0, 0)
+        # build size
+        if node.direction == VERTICAL:
+            W = max(W, w + L+R + l+r)
+            H += h + T+B + t+b
+        if node.direction == HORIZONTAL:
+            W += w + L+R + l+r
+            H = max(H, h + T+B + t+b)
+        # coerce
+        if deco:
+            # minimum 10x10 pixels inside a deco
+            if W < (L+R+10): W = (L+R+10)
+            if H < (T+B+10): H = (T+B+10)
+    # coerce to requested size
+    if W < node.w: W = node.w
+    if H < node.h: H = node.h
+    return (W, H)
+
+# size of a single node: the items of the node are all
+# given by their size (w, h), sub-trees are not allowed
+def nodeSize(node):
+    sizes, children = [], []
+    for item, align, border, deco in node.children:
+        children.append((len(sizes), align, border, deco))
+        sizes.append(tuple(item))
+    return _groupSize(node, children, sizes)
+
+def solveLayout(tree, position = (0, 0)):
+
+    # flatten
+    sizes, groups = [], []
+    _flatten(tree, sizes, groups)
+
+    # sizes: children groups come first in post-order
+    for index, node, children in groups:
+        sizes[index] = _groupSize(node, children, sizes)
+
+    # positions: parents come first in reversed post-order
+    # (same rules as layout.Group.SetPosition)
+    positions = [(0, 0)]*len(sizes)
+    positions[0] = tuple(position)
+    for index, node, children in reversed(groups):
+        X, Y = positions[index]
+        W, H = sizes[index]
+        x, y = 0, 0
+        for i, align, border, deco in children:
+            w, h = sizes[i]
+            l, r, t, b = border
+            L, R, T, B = deco or (0, 0, 0, 0)
+
+            if node.direction == VERTICAL:
+                # get horizontal offset
+                if align == LEFT:   x = l+L
+                if align == CENTER: x = W/2-w/2
+                if align == RIGHT:  x = W-w-r-R
+                # set position
+                positions[i] = (X + x, Y + y + t+T)
+                # shift vertical position for next item
+                y += h + t+b + T+B
+
+            elif node.direction == HORIZONTAL:
+                # get vertical offset
+                if align == TOP:    y = t+T
+                if align == CENTER: y = H/2-h/2
+                if align == BOTTOM: y = H-h-b-B
+                # set position
+                positions[i] = (int(X+x+l+L), int(Y+y))
+                # shift horizontal position for next item
+                x += w + l+r + L+R
+
+    # build rectangles
+    return [(x, y, w, h) for (x, y), (w, h) in zip(positions, sizes)]
+
+# same as solveLayout() with a (n, 4) array result
+# (a plain list when numpy is not installed)
+def layoutArray(tree, position = (0, 0)):
+    rects = solveLayout(tree, position)
+    if nparray is None: return rects
+    return nparray(rects, dtype = float)
+
+if __name__ == "__main__":
+
+    from pyvigi.tools import header
+    header()
+
+    from sys import version
+    print(f"run Python version {version.split(' ')[0]}")
+
+    from pyvigi import version
+    print(f"using pyvigi version {version}")
+
+    # benchmark: build trees of channel blocks (a vertical
+    # group of horizontal rows of items) and solve them
+
+    from time import perf_counter
+
+    def build(n, width = 20):
+        top = layoutNode(VERTICAL)
+        row = None
+        for i in range(n):
+            if i % width == 0:
+                row = layoutNode(HORIZONTAL)
+                top.Add(row, LEFT, (5, 5, 5, 5), (3, 3, 3, 3))
+            row.Add((20, 30), CENTER, (2, 2, 2, 2))
+        return top
+
+    print(f"{'items':>8} {'build (s)':>10} {'solve (s)':>10} {'size':>16}")
+    for n in [10000, 30000, 100000]:
+        t0 = perf_counter()
+        tree = build(n)
+        t1 = perf_counter()
+        rects = solveLayout(tree)
+        t2 = perf_counter()
+        x, y, w, h = rects[0]
+        print(f"{n:>8} {t1-t0:>10.3f} {t2-t1:>10.3f} {f'{int(w)}x{int(h)}':>16}")
@@ -11,6 +11,9 @@
 # constants, methods and classes are imported individually
 # this allows to identify clearly the packages usage
 
+# from standard packages:
+from contextlib import contextmanager
+
 # from wxpython: https://www.wxpython.org/
 
 from wx import MemoryDC             as wxMemoryDC
@@ -26,25 +29,35 @@ from wx import BRUSHSTYLE_SOLID     as wxBRUSHSTYLE_SOLID
 
 from wx import Colour               as wxColour
 
+# from this package
+from pyvigi.base import tiledBitmap
+from pyvigi.base import scheduleCall
+from pyvigi.theme import imageCollect
+from pyvigi.theme import _bitmapCache
+from pyvigi.theme import scaleDrop
+from pyvigi.geometry import layoutNode
+from pyvigi.geometry import solveLayout
+from pyvigi.geometry import nodeSize
+
 BackgroundColour = wxColour( 60,  60,  60)
 TextColour       = wxColour(150, 150, 150)
 
-# constants declaration
-
-# options constants can be combined
-# (some combinaison may be contradictory: avoid them)
-_opt = 1
+# backgrounds larger than this area (in pixels) or
+# with a side longer than TILED_SIDE (native bitmaps
+# are limited to 32767 pixels per side on X11) are
+# stored as tiled bitmaps (see base.tiledBitmap)
+TILED_AREA = 4096*4096
+TILED_SIDE = 16384
 
-# directions
-HORIZONTAL  = _opt; _opt<<=1    
-VERTICAL    = _opt; _opt<<=1   
-
-# alignments
-CENTER      = _opt; _opt<<=1
-LEFT        = _opt; _opt<<=1
-RIGHT       = _opt; _opt<<=1
-TOP         = _opt; _opt<<=1
-BOTTOM      = _opt; _opt<<=1
+# constants declaration
+# (defined in geometry.py, the layout solver)
+from pyvigi.geometry import HORIZONTAL
+from pyvigi.geometry import VERTICAL
+from pyvigi.geometry import CENTER
+from pyvigi.geometry import LEFT
+from pyvigi.geometry import RIGHT
+from pyvigi.geometry import TOP
+from pyvigi.geometry import BOTTOM
 
 # #################################################### GROUP
 
@@ -68,6 +81,25 @@ class Group:
         self.parent    = None   # this group parent
         # the parent parameter is set during a call
         # of the "Place()" method by a parent control
+
+        # deferred layout (see Freeze)
+        self.frozen  = 0        # freeze count
+        self.pending = False    # a layout was deferred
+        self.placed  = False    # positioned at least once
+
+        # size cache (see GetSize)
+        self.size = None
+
+        # visibility (see Show)
+        self.shown = True
+
+        # background surface of the top group
+        # (see DrawAllDecorations and RedrawDecorations)
+        self.ctrl    = None     # control owning the background
+        self.surface = None     # background bitmap
+        self.tile    = None     # background tile size
+        self.frames  = {}       # decorated areas "id(item)":(rect, deco)
+        self.damaged = []       # areas to redraw
         
         # change deco to decoration
         # group all the property together: align, deco, border
@@ -114,6 +146,12 @@ class Group:
         # this is the top group.
         if isinstance(item, Group):
             item.parent = self
+            # its layout is now done by the tree
+            item.pending = False
+
+        # the size of this group and of
+        # its parents must be computed again
+        self.InvalidateSize()
 
         # Update geometry of the group tree
         # This is done every time a new object
@@ -244,123 +282,315 @@ class Group:
         self._UpdateGeometry()
         return
 
+    # Freeze() defers the layout: the items can then be
+    # placed without any geometry update. The geometry
+    # is updated once by the matching call to Layout().
+    # A new group (no parent, never positioned) defers
+    # its layout as well: a row can be filled and then
+    # placed at no cost. A top group built without
+    # Batch() must be given a final Layout() call (or a
+    # SetPosition() or DrawAllDecorations() call).
+    # Example:
+    #   top.Freeze()
+    #   ... any number of Place() calls in the tree ...
+    #   top.Layout()
+    # or equivalently:
+    #   with top.Batch():
+    #       ... any number of Place() calls ...
+
+    def Freeze(self):
+        self.frozen += 1
+        return
+
+    def Layout(self):
+        # unfreeze
+        if self.frozen: self.frozen -= 1
+        # perform the deferred layout
+        if not self.frozen and self.pending:
+            self.pending = False
+            if self.parent:
+                self.parent._UpdateGeometry()
+            else:
+                self.SetPosition((self.x, self.y))
+        return
+
+    @contextmanager
+    def Batch(self):
+        self.Freeze()
+        try:
+            yield self
+        finally:
+            self.Layout()
+
     # finds the top parent and reset positions
     def _UpdateGeometry(self):
+        # frozen group: defer until Layout()
+        if self.frozen:
+            self.pending = True
+            return
         # find top parent
         if self.parent:
             self.parent._UpdateGeometry()
+        # a group without parent that was never positioned
+        # is being filled: its layout is deferred until it
+        # is placed in a group, positioned, or Layout() is
+        # called (DrawAllDecorations() calls Layout())
+        elif not self.placed:
+            self.pending = True
         else:
             # set position of child objects.
             # top parent has position (0, 0) by default.
             self.SetPosition((self.x, self.y))
         return
 
+    # The positions of all the items of the tree are
+    # computed in one pass by the geometry solver (see
+    # geometry.py) and then applied to the items.
+
     def SetPosition(self, position):
-        # record the new position
-        self.x, self.y = position
-        # get this group size (recursive)
-        W, H = self.GetSize()                   
+        # the deferred layout is done here
+        self.placed, self.pending = True, False
+        # build the geometry tree, "items" receives
+        # the items of the tree in pre-order and "decos"
+        # their (deco, border, geometry)
+        items, decos = [self], [(None, (0, 0, 0, 0), None)]
+        tree = self._GetNode(items, decos)
+        # solve the tree
+        rects = solveLayout(tree, position)
+        # apply
+        for item, (x, y, w, h) in zip(items, rects):
+            if isinstance(item, Group):
+                # record position and size
+                item.x, item.y = x, y
+                item.size = (w, h)
+            else:
+                item.SetPosition((int(x), int(y)))
+        # top group: find the decorations that moved
+        if self.parent is None:
+            self._TrackFrames(items, decos, rects)
+        # done
+        return
 
-        # reset all children positions
-        x, y = 0, 0
+    # build the geometry tree of this group (recursive)
+    def _GetNode(self, items, decos):
+        node = layoutNode(self.direction, self.w, self.h)
         for item, align, deco, border in zip(
             self.items, self.alignments, self.decorations, self.borders):
-            # get geometry (width, height)
-            w, h = item.GetSize()
-            # get border (left, right, top, bottom)
-            l, r, t, b = border 
             # get decors geometry
-            L, R, T, B = 0, 0, 0, 0
-            if deco: L, R, T, B = \
-                Decorations.GetGeometry(deco)
-
-            if self.direction == VERTICAL:
-                # get horizontal offset
-                if align == LEFT:   x = l+L
-                if align == CENTER: x = W/2-w/2
-                if align == RIGHT:  x = W-w-r-R
-                # set position
-                item.SetPosition((self.x + x, self.y + y + t+T))
-                # shift vertical position for next item
-                y += h + t+b + T+B
-
-            if self.direction == HORIZONTAL:
-                # get vertical offset
-                if align == TOP:    y = t+T
-                if align == CENTER: y = H/2-h/2
-                if align == BOTTOM: y = H-h-b-B
-                # set position
-                item.SetPosition((int(self.x+x+l+L), int(self.y+y)))
-                # shift horizontal position for next item
-                x += w + l+r + L+R
-        # done
+            geometry = None
+            if deco: geometry = Decorations.GetGeometry(deco)
+            items.append(item)
+            decos.append((deco, border, geometry))
+            # get the sub-tree or the item size
+            if isinstance(item, Group):
+                child = item._GetNode(items, decos)
+            else:
+                child = item.GetSize()
+            node.Add(child, align, border, geometry)
+        return node
+
+    # record the decorated areas of the tree and mark the
+    # areas of the decorations that changed (old and new)
+    def _TrackFrames(self, items, decos, rects):
+        frames = {}
+        for item, (deco, border, geometry), (x, y, w, h) in zip(
+            items, decos, rects):
+            if not deco: continue
+            l, r, t, b = border
+            L, R, T, B = geometry
+            rect = (int(x-l-L), int(y-t-T),
+                int(w+l+r+L+R), int(h+t+b+T+B))
+            frames[id(item)] = rect, deco
+        # compare with the previous layout
+        damaged = []
+        for key in frames.keys() | self.frames.keys():
+            new, old = frames.get(key), self.frames.get(key)
+            if new == old: continue
+            if old: damaged.append(old[0])
+            if new: damaged.append(new[0])
+        self.frames = frames
+        # record
+        if damaged: self.Damage(*damaged)
         return
 
     def GetPosition(self):
         return (self.x, self.y)
 
-    def _GetMinSize(self):
-        # current position start at 0, 0
-        W, H = 0, 0
-        for item, deco, border in zip(
-            self.items, self.decorations, self.borders):
-            # get geometry (width, height)
-            w, h = item.GetSize()
-            # get border (left, right, top, bottom)
-            l, r, t, b = border 
-            # get decors geometry
-            L, R, T, B = 0, 0, 0, 0
-            if deco: L, R, T, B = \
-                Decorations.GetGeometry(deco)
-            # build size
-            if self.direction == VERTICAL:
-                W = max(W, w + L+R + l+r)
-                H += h + T+B + t+b
-            if self.direction == HORIZONTAL:
-                W += w + L+R + l+r
-                H = max(H, h + T+B + t+b)
-            # coerce
-            if deco:
-                # minimum 10x10 pixels inside a deco
-                if W < (L+R+10): W = (L+R+10)
-                if H < (T+B+10): H = (T+B+10)
-        #done
-        return (W, H)
+    # The group size is computed once and kept until the
+    # group content changes: placing an item invalidates
+    # the size of the group and of all its parents. When
+    # the size of an item that is not a group changes,
+    # InvalidateSize() must be called on its group.
+
+    def InvalidateSize(self):
+        # a group size is computed from the sizes of its
+        # items: the parents of an invalid group are thus
+        # invalid already and the propagation stops there
+        g = self
+        while g and g.size is not None:
+            g.size = None
+            g = g.parent
+        return
 
     def GetSize(self):
-        # get geometry
-        W, H = self._GetMinSize()
-        # coerce to requested size
-        if W < self.w: W = self.w
-        if H < self.h: H = self.h
-        return (W, H)
+        # use cached size
+        if self.size is not None:
+            return self.size
+        # describe this group with the size of its
+        # items and get its size from the solver
+        node = layoutNode(self.direction, self.w, self.h)
+        for item, align, deco, border in zip(
+            self.items, self.alignments, self.decorations, self.borders):
+            # get decors geometry
+            geometry = None
+            if deco: geometry = Decorations.GetGeometry(deco)
+            node.Add(item.GetSize(), align, border, geometry)
+        # record
+        self.size = nodeSize(node)
+        return self.size
 
     # Called once from top group
     # (no deco around the top group)
-    def DrawAllDecorations(self, Ctrl):
+    # "tile" is the tile size of a tiled background
+    # (by default, only very large backgrounds are tiled)
+    # The background surface is kept by the top group:
+    # later changes of the decorations (moved, resized,
+    # hidden) only redraw the areas concerned (see Damage).
+    def DrawAllDecorations(self, Ctrl, tile = None):
+        # perform any deferred layout
+        if self.pending and not self.frozen:
+            self.Layout()
+        # drop the scaled variants of the previous surface
+        previous = getattr(Ctrl, "BackgroundBitmap", None)
+        if previous is not None: scaleDrop(previous)
         # get the group geometry
         w, h = self.GetSize()
-        # create bitmap of the same size
-        Ctrl.BackgroundBitmap = wxBitmap(w, h)
-        # create device context for drawing
-        dc = wxMemoryDC()
-        dc.SelectObject(Ctrl.BackgroundBitmap)
+        # large background: tiles rendered on demand
+        if tile is None and (w*h > TILED_AREA
+            or max(w, h) > TILED_SIDE): tile = 512
+        if tile:
+            Ctrl.BackgroundBitmap = tiledBitmap(
+                int(w), int(h), self._RenderArea, tile)
+        else:
+            # create bitmap of the same size
+            Ctrl.BackgroundBitmap = wxBitmap(w, h)
+            # create device context for drawing
+            dc = wxMemoryDC()
+            dc.SelectObject(Ctrl.BackgroundBitmap)
+            # draw background and decorations
+            self._RenderArea(dc, wxRect(0, 0, w, h))
+            # release device context
+            dc.SelectObject(wxNullBitmap)
+        # keep the surface
+        self.ctrl, self.tile = Ctrl, tile
+        self.surface = Ctrl.BackgroundBitmap
+        self.damaged = []
+        # done        
+        return
+
+    # mark areas (x, y, w, h) of the background to be
+    # redrawn on the next frame. By default, the area of
+    # this group and of its decoration.
+    def Damage(self, *rects):
+        # find top parent
+        top = self
+        while top.parent: top = top.parent
+        # no background surface
+        if top.ctrl is None: return
+        # get the area of this group
+        if not rects:
+            W, H = self.GetSize()
+            rect = int(self.x), int(self.y), int(W), int(H)
+            if id(self) in top.frames:
+                rect, deco = top.frames[id(self)]
+            rects = [rect]
+        for rect in rects:
+            top.damaged.append(wxRect(*rect))
+        # redraw once per frame
+        scheduleCall((id(top), "decorations"),
+            top.ctrl, top.RedrawDecorations)
+        return
+
+    # redraw the damaged areas of the background surface
+    # and refresh these areas of the control
+    def RedrawDecorations(self):
+        damaged, self.damaged = self.damaged, []
+        Ctrl = self.ctrl
+        if Ctrl is None or not damaged: return
+        # the background was replaced: stop tracking
+        if Ctrl.BackgroundBitmap is not self.surface:
+            scaleDrop(self.surface)
+            self.ctrl, self.surface = None, None
+            return
+        # the size changed: redraw everything
+        w, h = self.GetSize()
+        W, H = self.surface.GetSize()
+        if (W, H) != (int(w), int(h)):
+            self.DrawAllDecorations(Ctrl, self.tile)
+            Ctrl.Refresh()
+            return
+        # clip areas to the surface
+        rects = []
+        for r in damaged:
+            r = r.Intersect(wxRect(0, 0, W, H))
+            if not r.IsEmpty(): rects.append(r)
+        # tiled surface: tiles are rendered again on demand
+        if isinstance(self.surface, tiledBitmap):
+            for r in rects:
+                self.surface.Invalidate(r)
+        else:
+            dc = wxMemoryDC()
+            dc.SelectObject(self.surface)
+            for r in rects:
+                dc.SetClippingRegion(r)
+                self._RenderArea(dc, r)
+                dc.DestroyClippingRegion()
+            dc.SelectObject(wxNullBitmap)
+            # the scaled variants are outdated
+            scaleDrop(self.surface)
+        # refresh the control
+        for r in rects:
+            Ctrl.RefreshRect(r, False)
+        return
+
+    # show or hide all the items of this group (recursive)
+    # a hidden group keeps its place in the layout but its
+    # decorations (and the one around it) are not drawn
+    def Show(self, show = True):
+        show = bool(show)
+        if self.shown == show: return
+        self.shown = show
+        for item in self.items:
+            item.Show(show)
+        self.Damage()
+        return
+
+    def Hide(self):
+        self.Show(False)
+        return
+
+    def IsShown(self):
+        return self.shown
+
+    # draw the background and the decorations of an area
+    def _RenderArea(self, dc, rect):
         # set background color
         dc.SetPen(wxTRANSPARENT_PEN)
         dc.SetBrush(wxBrush(BackgroundColour, wxSOLID))
-        dc.DrawRectangle(0, 0, w, h)
+        dc.DrawRectangle(rect)
         # draw decorations recursively
-        self._DrawDecorations(dc)
-        # release device context
-        dc.SelectObject(wxNullBitmap)
-        # done        
+        self._DrawDecorations(dc, rect)
         return
 
-    def _DrawDecorations(self, dc):
+    # draw the decorations (intersecting "area" if given)
+    def _DrawDecorations(self, dc, area = None):
         # check for empty contents
         if self.items: 
             for item, name, border in zip(
                 self.items, self.decorations, self.borders):
+                # hidden group
+                if isinstance(item, Group) and not item.shown:
+                    continue
                 # check deco
                 if name:
                     # Get geometry
@@ -368,21 +598,42 @@ class Group:
                     x, y = item.GetPosition()
                     l, r, t, b = border
                     L, R, T, B = Decorations.GetGeometry(name)
-                    # get deco bitmap
-                    Bitmap = Decorations.GetBitmap(
-                        name, w+l+r+L+R, h+t+b+T+B)
+                    W, H = w+l+r+L+R, h+t+b+T+B
+                    X, Y = int(x-l-L), int(y-t-T)
+                    rect = wxRect(X, Y, int(W), int(H))
                     # draw deco
-                    dc.DrawBitmap(Bitmap, x-l-L, y-t-T)
+                    if area is None or area.Contains(rect):
+                        # get deco bitmap
+                        Bitmap = Decorations.GetBitmap(name, W, H)
+                        dc.DrawBitmap(Bitmap, X, Y)
+                    # partly inside the area (a tile, a redrawn
+                    # area): draw the parts found in the area
+                    elif area.Intersects(rect):
+                        Decorations.DrawArea(dc, name, rect, area)
                 # draw children deco
                 if isinstance(item, Group):
-                    item._DrawDecorations(dc)
+                    item._DrawDecorations(dc, area)
         return
 
+# geometry (left, right, top, bottom) of the
+# decorations found in the "borders" sheet
+DECORATION_BORDER = (8, 8, 8, 8)
+
+# the rendered decorations are cached, keyed by
+# (name, width, height), within this budget (bytes)
+DECORATION_BUDGET = 32*1024*1024
+
 class _decorationsLibrary():
 
     # decorations elements are "name":(Sample, l, r, t, b)
-    def __init__(self):
+    # slices elements are "name":{"tl": tile, "t": tile, ...}
+    # strips elements are ("name", edge):strip (see _GetStrip)
+    def __init__(self, budget = DECORATION_BUDGET):
         self.decorations = {} 
+        self.slices = {}
+        self.strips = {}
+        # rendered bitmaps
+        self.bitmaps = _bitmapCache(budget)
         return
 
     def _GetSampleAndGeometry(self, Name):
@@ -393,13 +644,16 @@ class _decorationsLibrary():
             Sample, l, r, t, b = self.decorations[Name]
 
         else:
-            # get image
-            lib, names = Theme.GetImages("Decoration", Name)
-            if lib and names:
+            # get image: imageCollect() returns None (not
+            # found), a single image or a (image, tags) list
+            image = imageCollect("borders", "full", Name.lower())
+            if isinstance(image, list):
+                image = image[0][0] if image else None
+            if image is not None:
                 # get sample
-                Sample = lib.Get(Name+"_0")
+                Sample = image.GetBitmap()
                 # get geometry
-                l,r,t,b = Theme.GetValue("Decoration", "Border")
+                l, r, t, b = DECORATION_BORDER
                 # store results
                 self.decorations[Name] = (Sample, l, r, t, b)
 
@@ -426,11 +680,47 @@ class _decorationsLibrary():
 
         return Sample, l, r, t, b
 
-    # get the sample and expand it to the required size
+    # cut the sample into its nine slices (once per sample)
+    # the center slice is not used: the inside of the
+    # decoration is filled with the background colour
+    def _GetSlices(self, Name):
+        if Name not in self.slices:
+            Sample, l, r, t, b = self._GetSampleAndGeometry(Name)
+            W, H = Sample.GetSize()
+            self.slices[Name] = {
+                "tl" : Sample.GetSubBitmap(wxRect(0,   0,   l,     t    )),
+                "t"  : Sample.GetSubBitmap(wxRect(l,   0,   W-l-r, t    )),
+                "tr" : Sample.GetSubBitmap(wxRect(W-r, 0,   r,     t    )),
+                "l"  : Sample.GetSubBitmap(wxRect(0,   t,   l,     H-t-b)),
+                "r"  : Sample.GetSubBitmap(wxRect(W-r, t,   r,     H-t-b)),
+                "bl" : Sample.GetSubBitmap(wxRect(0,   H-b, l,     b    )),
+                "b"  : Sample.GetSubBitmap(wxRect(l,   H-b, W-l-r, b    )),
+                "br" : Sample.GetSubBitmap(wxRect(W-r, H-b, r,     b    )),
+                }
+        return self.slices[Name]
+
+    # get the decoration bitmap of the required size
+    # (rendered once, then taken from the cache: the
+    # bitmap is shared and must not be modified)
     def GetBitmap(self, name, width, height):
-        # get geometry and sample
+        key = name, int(width), int(height)
+        Bitmap = self.bitmaps.Get(key)
+        if Bitmap is None:
+            Bitmap = self.bitmaps.Put(key, self._Render(*key))
+        return Bitmap
+
+    def SetBudget(self, budget):
+        self.bitmaps.SetBudget(budget)
+        return
+
+    def Stats(self):
+        return self.bitmaps.Stats()
+
+    # expand the sample to the required size
+    def _Render(self, name, width, height):
+        # get geometry and slices
         Sample, l, r, t, b = self._GetSampleAndGeometry(name)
-        W, H = Sample.GetSize()
+        S = self._GetSlices(name)
         w, h = width, height
         # create Bitmap
         Bitmap = wxBitmap(w, h, wxBITMAP_SCREEN_DEPTH)
@@ -441,55 +731,117 @@ class _decorationsLibrary():
         dc.SetPen(wxTRANSPARENT_PEN)
         dc.SetBrush(wxBrush(BackgroundColour, wxBRUSHSTYLE_SOLID))
         dc.DrawRectangle(0, 0, width, height)
-        # top
-        tile = Sample.GetSubBitmap(wxRect(l, 0, W-l-r, t))
-        self._TileHorizontally(dc, tile,   l, 0, w-l-r)
-        # bottom
-        tile = Sample.GetSubBitmap(wxRect(l, H-b, W-l-r, b))
-        self._TileHorizontally(dc, tile,   l, h-b, w-l-r)
-        # left
-        tile = Sample.GetSubBitmap(wxRect(0, t, l, H-t-b))
-        self._TileVertically(dc, tile,     0, t,    h-t-b)
-        # right
-        tile = Sample.GetSubBitmap(wxRect(W-r, t, r, H-t-b))
-        self._TileVertically(dc, tile,     w-r, t,    h-t-b)
-        # top left
-        tile = Sample.GetSubBitmap(wxRect(0, 0, l, t))
-        dc.DrawBitmap(tile,                0, 0)
-        # top right
-        tile = Sample.GetSubBitmap(wxRect(W-r, 0, r, t))
-        dc.DrawBitmap(tile,                w-r, 0)
-        # bottom left
-        tile = Sample.GetSubBitmap(wxRect(0, H-b, l, b))
-        dc.DrawBitmap(tile,                0, h-b)
-        # bottom right
-        tile = Sample.GetSubBitmap(wxRect(W-r, H-b, r, b))
-        dc.DrawBitmap(tile,                w-r, h-b)
+        # edges
+        self._DrawEdge(dc, name, "t", l,   0,   w-l-r)
+        self._DrawEdge(dc, name, "b", l,   h-b, w-l-r)
+        self._DrawEdge(dc, name, "l", 0,   t,   h-t-b)
+        self._DrawEdge(dc, name, "r", w-r, t,   h-t-b)
+        # corners
+        dc.DrawBitmap(S["tl"], 0,   0)
+        dc.DrawBitmap(S["tr"], w-r, 0)
+        dc.DrawBitmap(S["bl"], 0,   h-b)
+        dc.DrawBitmap(S["br"], w-r, h-b)
         # release dc
         dc.SelectObject(wxNullBitmap)
         # done
         return Bitmap
 
-    def _TileHorizontally(self, dc, tile, x, y, width):
+    # An edge is drawn with a single blit from a strip
+    # of repeated tiles. The strip of each (name, edge)
+    # is kept and grown by doubling when a longer edge
+    # is requested: each doubling is one blit of the
+    # strip onto itself.
+
+    def _GetStrip(self, name, edge, length):
+        key = name, edge
+        tile = self._GetSlices(name)[edge]
+        strip = self.strips.get(key, tile)
+        w, h = strip.GetSize()
+        horizontal = edge in ["t", "b"]
+        # current length
+        n = w if horizontal else h
+        if n < length:
+            # the strip is a copy of the tile...
+            w, h = tile.GetSize()
+            n = w if horizontal else h
+            # ...doubled to the required length
+            N = n
+            while N < length: N *= 2
+            strip = wxBitmap(
+                N if horizontal else w,
+                h if horizontal else N,
+                wxBITMAP_SCREEN_DEPTH)
+            dc = wxMemoryDC()
+            dc.SelectObject(strip)
+            # the decoration background shows
+            # through transparent pixels
+            dc.SetPen(wxTRANSPARENT_PEN)
+            dc.SetBrush(wxBrush(BackgroundColour, wxBRUSHSTYLE_SOLID))
+            dc.DrawRectangle(0, 0, *strip.GetSize())
+            dc.DrawBitmap(tile, 0, 0)
+            while n < N:
+                if horizontal:
+                    dc.Blit(n, 0, n, h, dc, 0, 0)
+                else:
+                    dc.Blit(0, n, w, n, dc, 0, 0)
+                n *= 2
+            dc.SelectObject(wxNullBitmap)
+        # record
+        self.strips[key] = strip
+        return strip
+
+    # draw an edge (only its part found in "area" if given)
+    def _DrawEdge(self, dc, name, edge, x, y, length, area = None):
+        # empty edge
+        tile = self._GetSlices(name)[edge]
         w, h = tile.GetSize()
-        for i in range(int(width/w)):
-            dc.DrawBitmap(tile, x, y)
-            x += w
-        remainder = width % w
-        if remainder:
-            clip = wxRect(0, 0, remainder, h)
-            dc.DrawBitmap(tile.GetSubBitmap(clip) , x, y)
+        if length <= 0 or w <= 0 or h <= 0: return
+        horizontal = edge in ["t", "b"]
+        # edge rectangle
+        if horizontal: rect = wxRect(x, y, length, h)
+        else: rect = wxRect(x, y, w, length)
+        # clip to the area
+        if area is not None:
+            rect = rect.Intersect(area)
+            if rect.IsEmpty(): return
+        # position in the strip: the strip repeats the
+        # tile, the start is taken in the first period
+        if horizontal:
+            sx, sy = (rect.x - x) % w, rect.y - y
+            n = sx + rect.width
+        else:
+            sx, sy = rect.x - x, (rect.y - y) % h
+            n = sy + rect.height
+        # get strip
+        strip = self._GetStrip(name, edge, n)
+        # single blit
+        source = wxMemoryDC()
+        source.SelectObjectAsSource(strip)
+        dc.Blit(rect.x, rect.y, rect.width, rect.height, source, sx, sy)
+        source.SelectObject(wxNullBitmap)
         return
 
-    def _TileVertically(self, dc, tile, x, y, height):
-        w, h = tile.GetSize()
-        for i in range(int(height/h)):
-            dc.DrawBitmap(tile, x, y)
-            y += h
-        remainder = height % h
-        if remainder: 
-            clip = wxRect(0, 0, w, remainder)
-            dc.DrawBitmap(tile.GetSubBitmap(clip) , x, y)
+    # draw the parts of the decoration "rect" found in
+    # "area" without building the full size bitmap (used
+    # for the tiles and the redrawn areas of a background:
+    # the inside is already filled with the background)
+    def DrawArea(self, dc, name, rect, area):
+        Sample, l, r, t, b = self._GetSampleAndGeometry(name)
+        S = self._GetSlices(name)
+        x, y, w, h = rect.x, rect.y, rect.width, rect.height
+        # edges
+        self._DrawEdge(dc, name, "t", x+l,   y,     w-l-r, area)
+        self._DrawEdge(dc, name, "b", x+l,   y+h-b, w-l-r, area)
+        self._DrawEdge(dc, name, "l", x,     y+t,   h-t-b, area)
+        self._DrawEdge(dc, name, "r", x+w-r, y+t,   h-t-b, area)
+        # corners
+        for key, X, Y in [
+            ("tl", x,     y    ),
+            ("tr", x+w-r, y    ),
+            ("bl", x,     y+h-b),
+            ("br", x+w-r, y+h-b)]:
+            if area.Intersects(wxRect(X, Y, *S[key].GetSize())):
+                dc.DrawBitmap(S[key], X, Y)
         return
 
     def GetGeometry(self, name):
@@ -498,9 +850,7 @@ class _decorationsLibrary():
 
 # create empty library
 # (The library fills up as decorations get requested)
-
-
-# Decorations = _decorationsLibrary()                   # DISABLED
+Decorations = _decorationsLibrary()
 
 if __name__ == "__main__":
 
@@ -538,9 +888,12 @@ if __name__ == "__main__":
                     bitmapControl(
                         self.Panel, imageSelect(LEDS, "on", s)))
 
+            # single layout pass after all the placements
             content = Group(HORIZONTAL)
-            for l in self.leds:
-                content.Place(l, border = (50, 50, 50, 50))
+            with content.Batch():
+                for l in self.leds:
+                    content.Place(l, deco = "Groove",
+                        border = (50, 50, 50, 50))
 
             content.DrawAllDecorations(self.Panel)
 
@@ -14,13 +14,36 @@
 # from standard packages:
 from sys import path                    as syspath
 from os.path import isfile              as osisfile
+from os.path import dirname             as osdirname
+from os import stat                     as osstat
+from os import scandir
+from os import getcwd
+from time import monotonic
+from os import replace                  as osreplace
+from os import remove                   as osremove
+from os import getpid
+from json import dumps                  as jsondumps
+from json import loads                  as jsonloads
+from atexit import register             as atexitregister
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from weakref import WeakValueDictionary
+from hashlib import blake2b
+from itertools import count
 
 # from wxpython: https://www.wxpython.org/
 
 # wx bitmap methods
 from wx import Bitmap                   as wxBitmap
+from wx import Image                    as wxImage
 from wx import BITMAP_TYPE_PNG          as wxBITMAP_TYPE_PNG
 from wx import Rect                     as wxRect
+from wx import Size                     as wxSize
+from wx import IMAGE_QUALITY_HIGH       as wxIMAGE_QUALITY_HIGH
+from wx import Colour                   as wxColour
+from wx import MemoryDC                 as wxMemoryDC
+from wx import NullBitmap               as wxNullBitmap
 
 """
 
@@ -33,6 +56,10 @@ from wx import Rect                     as wxRect
     collection a subset of images (by using keywords).
     The selection is a list of pointers to the images
 
+    The images are handles on the png file: the native
+    bitmaps are only clipped when they are first needed.
+    imageBitmap() returns the native bitmap of an image.
+
     todo: add a method to set the app background image?
 
     todo: add more examples to illustrate the functionaly
@@ -68,6 +95,27 @@ _PATHS = [
 # the path selection, addition, substraction could
 # be implemented to choose one theme amongst multiple others
 
+# the paths and the bundles (see loadBundle) are
+# ranked in the order they are added: "path":rank
+# (the default paths have the rank 0)
+_RANK = count(1)
+_RANKS = {}
+
+# add a search path (with the highest precedence)
+def addPath(path):
+    if path in _PATHS: _PATHS.remove(path)
+    _PATHS.append(path)
+    _RANKS[path] = next(_RANK)
+    _RESOLVER.Invalidate()
+    return
+
+# remove a search path
+def removePath(path):
+    if path in _PATHS: _PATHS.remove(path)
+    _RANKS.pop(path, None)
+    _RESOLVER.Invalidate()
+    return
+
 # debug flag
 _DEBUG = False
 
@@ -89,12 +137,103 @@ def DEBUG(switch):
     #done 
     return
 
+# The resolver lists the content of the search
+# directories once and builds a name:path map that
+# follows the same precedence as the search: the
+# last path has precedence over the previous ones
+# and the current directory over all of them. The
+# directories modification times are checked (at
+# most every _RESOLVE_DELAY seconds) to detect any
+# file added to or removed from the directories.
+
+# minimum delay between two directories checks (s)
+_RESOLVE_DELAY = 1.0
+
+class _resolver():
+
+    def __init__(self):
+        self.Invalidate()
+        return
+
+    def Invalidate(self):
+        self.paths  = None  # directories used for the map
+        self.stamps = []    # directories modification times
+        self.names  = {}    # "name":filepath map
+        self.checked = 0.0  # time of the last check
+        return
+
+    def _Directories(self):
+        # the current directory comes last (highest
+        # precedence) and is given the empty prefix
+        # so that the filepath returned is the name
+        # itself as it was passed to _findpath()
+        return [(p, f"{p}/") for p in _PATHS] + [(getcwd(), "")]
+
+    def _Stamp(self, directory):
+        try:
+            return osstat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _Build(self, directories):
+        self.names = {}
+        self.stamps = []
+        for d, prefix in directories:
+            self.stamps.append(self._Stamp(d))
+            try:
+                entries = list(scandir(d))
+            except OSError:
+                continue
+            # later directories overwrite the
+            # previous ones: last path wins
+            for e in entries:
+                if e.is_file():
+                    self.names[e.name] = f"{prefix}{e.name}"
+        self.paths = directories
+        self.checked = monotonic()
+        return
+
+    # "force" checks the time stamps without delay
+    def _Check(self, force = False):
+        directories = self._Directories()
+        # search paths changed: rebuild
+        if directories != self.paths:
+            self._Build(directories)
+            return
+        # check directories time stamps
+        if not force and monotonic() - self.checked < _RESOLVE_DELAY:
+            return
+        stamps = [self._Stamp(d) for d, prefix in directories]
+        if stamps != self.stamps:
+            self._Build(directories)
+            return
+        self.checked = monotonic()
+        return
+
+    def Find(self, name):
+        self._Check()
+        filepath = self.names.get(name)
+        # the file may have been added since the
+        # last check: check the directories again
+        if filepath is None:
+            self._Check(force = True)
+            filepath = self.names.get(name)
+        return filepath
+
+_RESOLVER = _resolver()
+
 # get a valid path
 def _findpath(path):
     
     # default
     filepath = None
     
+    # plain file names are found
+    # using the resolver map
+
+    if not osdirname(path):
+        return _RESOLVER.Find(path)
+
     # the passed parameter as priority
     # over the search results.
 
@@ -121,21 +260,133 @@ def _findpath(path):
     return filepath
 
 
-############################################ COLLECT
+############################################ INDEX
+
+# The definition files (".png.txt") are compiled only
+# once into a library: a list of (geometry, tags) pairs.
+# The compiled libraries are kept in "_INDEX" and are
+# keyed on the definition file path. Each entry also
+# records the file modification time and size so that
+# an edited definition file is automatically compiled
+# again. The index can optionally be saved on disk (see
+# "indexFile()") so that restarting the application
+# skips the parsing completely.
+
+# The index file is plain JSON (stamps, geometry and
+# tags only: the tag indexes are rebuilt on loading).
+# It is written once, when the application exits (or
+# when the index file is changed), and only if some
+# definition file was compiled. It is written to a
+# temporary file first and then renamed: a concurrent
+# instance reads either the old or the new index,
+# never a truncated one.
+
+# compiled libraries: {filepath: (stamp, library, tagindex)}
+_INDEX = {}
+
+# path of the on-disk copy of the index (None: disabled)
+_INDEX_FILE = None
+
+# compiled entries not yet written on disk
+_INDEX_DIRTY = False
+
+# on-disk format version (change when "library" changes)
+_INDEX_VERSION = 3
+
+def indexFile(filepath):
+
+    global _INDEX_FILE
+
+    # write the entries compiled for the previous file
+    _saveindex()
+
+    # set (or clear) the on-disk index file
+    _INDEX_FILE = filepath
+    if not filepath: return
+
+    # merge the content of an existing index file
+    # (entries are checked against the file stamps
+    # when used, so stale entries are harmless)
+    if osisfile(filepath):
+        try:
+            with open(filepath, encoding = "utf-8") as f:
+                data = jsonloads(f.read())
+            if data["version"] == _INDEX_VERSION:
+                for fp, (stamp, library) in data["index"].items():
+                    if fp in _INDEX: continue
+                    _INDEX[fp] = _loadentry(stamp, library)
+        except Exception:
+            # a corrupted index file is simply ignored
+            # and rewritten on the next compilation
+            pass
 
-# collect data list from the .txt file
-def _findpngs(name, *args):
+    # done
+    return
+
+# rebuild an index entry from its on-disk form
+# (restore the tuples of the compiled format)
+def _loadentry(stamp, library):
+    mtime, size = stamp
+    stamp = int(mtime), int(size)
+    entries = []
+    for geometry, tags in library:
+        geometry = tuple(
+            (int(a), int(b)) for a, b in geometry)
+        tags = tuple(str(t) for t in tags)
+        entries.append((geometry, tags))
+    tagindex = _tagindex([t for g, t in entries])
+    return stamp, entries, tagindex
+
+def _saveindex():
+
+    global _INDEX_DIRTY
+
+    # nothing to do
+    if not _INDEX_FILE: return
+    if not _INDEX_DIRTY: return
+    _INDEX_DIRTY = False
+
+    # on-disk form: {filepath: [stamp, library]}
+    index = {}
+    for fp, (stamp, library, tagindex) in _INDEX.items():
+        index[fp] = [list(stamp), [[geometry, list(tags)]
+            for geometry, tags in library]]
+    text = jsondumps({"version": _INDEX_VERSION, "index": index})
+
+    # the index is a cache: failing to write it
+    # must not prevent the application to run
+    temp = f"{_INDEX_FILE}.{getpid()}.tmp"
+    try:
+        with open(temp, 'w', encoding = "utf-8") as f:
+            f.write(text)
+        osreplace(temp, _INDEX_FILE)
+    except OSError:
+        try: osremove(temp)
+        except OSError: pass
+
+    # done
+    return
+
+# write the compiled entries when the application exits
+atexitregister(_saveindex)
+
+# get the stamp used to detect definition file changes
+def _stamp(filepath):
+    s = osstat(filepath)
+    return s.st_mtime_ns, s.st_size
+
+# parse a definition file into a library
+def _parsepngs(filepath):
 
     # load the definition file
-    f = open(_findpath(f'{name}.png.txt'))
-    if not f: return None
+    f = open(filepath)
     t = f.read()
     f.close()
 
     # build library
     library = []
     for s in t.split('\n'):
-        if not s: continue               # skip empty line
+        if not s.strip(): continue       # skip empty line
         if s.strip()[0] == '#': continue # skip commnent
         l = s.split(',')                 # parse at coma
 
@@ -154,44 +405,595 @@ def _findpngs(name, *args):
         geometry = offset, grid, size, position
 
         # record all parameters
-        library.append((geometry, taglist))
+        # (tags are kept as a tuple: the library
+        # is shared and must never be modified)
+        library.append((geometry, tuple(taglist)))
+
+    # done
+    return library
+
+# get the compiled library of a definition file
+def _compilepngs(filepath):
+
+    global _INDEX_DIRTY
+
+    # get current file stamp
+    stamp = _stamp(filepath)
+
+    # use the compiled library if it is up to date
+    if filepath in _INDEX:
+        s, library, tagindex = _INDEX[filepath]
+        if s == stamp: return library, tagindex
+
+    # (re-)compile and record
+    library = _parsepngs(filepath)
+    tagindex = _tagindex([tags for geometry, tags in library])
+    _INDEX[filepath] = stamp, library, tagindex
+    _INDEX_DIRTY = True
+
+    # done
+    return library, tagindex
+
+############################################ TAGS
+
+# Image lists are filtered by tags. Instead of scanning
+# the tag lists of every image, an inverted index is
+# built once: {tag: set of image positions}. Filtering
+# is then reduced to the intersection of a few sets.
+
+# build the inverted index of a list of tag lists
+def _tagindex(taglists):
+    tagindex = {}
+    for i, tags in enumerate(taglists):
+        for t in tags:
+            tagindex.setdefault(t, set()).add(i)
+    return tagindex
+
+# get the sorted positions of the images tagged with all args
+def _tagfilter(tagindex, n, args):
+
+    # no filter
+    if not args: return list(range(n))
+
+    # intersect starting from the smallest set
+    sets = sorted((tagindex.get(a, set()) for a in args), key = len)
+    positions = set(sets[0])
+    for p in sets[1:]:
+        positions &= p
+
+    # keep the images order
+    return sorted(positions)
+
+# collections returned by imageCollect are lists of
+# (image, taglist) pairs that carry their tag index.
+# (a collection should be handled as read-only)
+class _collection(list):
+
+    def __init__(self, pairs):
+        list.__init__(self, pairs)
+        self.tagindex = _tagindex([t for i, t in self])
+        return
+
+############################################ BUNDLES
+
+# Bundles are single files packing the sheets of a
+# theme (see bundle.py). The last bundle loaded has
+# precedence on the previous ones. The bundles and
+# the search paths follow the order in which they
+# are added: a sheet file found in a path added
+# (addPath) after a bundle was loaded replaces the
+# sheet of the bundle. The sheets of a bundle are
+# found before the sheets of the default paths and
+# of the current directory.
+
+# bundles: [(rank, bundle)]
+_BUNDLES = []
+
+def loadBundle(filepath):
+    from pyvigi.bundle import themeBundle
+    _BUNDLES.append((next(_RANK), themeBundle(filepath)))
+    return
+
+# find the bundle providing a sheet
+def _findbundle(name):
+    for rank, b in reversed(_BUNDLES):
+        if not b.Has(name): continue
+        # look for a sheet file in the paths added later
+        if any(r > rank for r in _RANKS.values()):
+            fp = _findpath(f'{name}.png')
+            if fp and _RANKS.get(osdirname(fp), 0) > rank:
+                return None
+        return b
+    return None
+
+############################################ COLLECT
+
+# collect data list from the .txt file
+def _findpngs(name, *args):
+
+    # get the compiled library from a bundle
+    bundle = _findbundle(name)
+    if bundle:
+        library, tagindex = bundle.Library(name)
+
+    else:
+        # find the definition file
+        fp = _findpath(f'{name}.png.txt')
+        if not fp: return None
+
+        # get the compiled library
+        library, tagindex = _compilepngs(fp)
 
     # collect pngs using the taglist as filter:
     # images which tags list contains all of
     # the arguments in args is added to the list  
     collection = []
-    for i in library:
-        geometry, taglist = i
+    for i in _tagfilter(tagindex, len(library), args):
+        geometry, tags = library[i]
 
-        # filter
-        valid = True
+        # remove filter tags from a copy
+        # of the taglist (the library is
+        # shared by all the collections)
+        taglist = list(tags)
         for a in args:
-            if a not in taglist:
-                valid = False
+            taglist.remove(a)
+
+        # collect
+        collection.append((geometry, taglist))
+
+    # done
+    return collection
+
+############################################ CACHE
+
+# Decoded sheets and clipped images are shared by all
+# the collections through a process-wide cache. The
+# cache is bounded by a memory budget (in bytes, the
+# native bitmaps being counted as 4 bytes per pixel).
+# The least recently used bitmaps are dropped first
+# when the budget is exceeded. A bitmap dropped from
+# the cache remains valid for the controls using it.
+
+class _bitmapCache():
+
+    def __init__(self, budget):
+
+        # parameters
+        self.budget = budget
 
-        # add item to collection
-        if valid:
+        # entries are "key":(bitmap, nbytes),
+        # the most recently used entry is last
+        self.entries = OrderedDict()
+        self.bytes = 0
 
-            # remove filter tags from taglist
-            for a in args:
-                taglist.remove(a)
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
-            # collect
-            collection.append((geometry, taglist))
+        # done
+        return
+
+    def Get(self, key):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            bitmap, nbytes = self.entries[key]
+            return bitmap
+        self.misses += 1
+        return None
+
+    def Put(self, key, bitmap):
+        # replace a previous entry
+        if key in self.entries:
+            b, nbytes = self.entries.pop(key)
+            self.bytes -= nbytes
+        # add entry
+        w, h = bitmap.GetSize()
+        nbytes = 4*w*h
+        self.entries[key] = bitmap, nbytes
+        self.bytes += nbytes
+        # respect budget
+        self._Evict()
+        return bitmap
+
+    def _Evict(self):
+        # drop least recently used entries
+        # (an entry larger than the budget
+        # is not kept at all)
+        while self.bytes > self.budget and self.entries:
+            key, (b, nbytes) = self.entries.popitem(last = False)
+            self.bytes -= nbytes
+            self.evictions += 1
+        return
+
+    def SetBudget(self, budget):
+        self.budget = budget
+        self._Evict()
+        return
+
+    def Clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        return
+
+    def Stats(self):
+        return {
+            "hits"      : self.hits,
+            "misses"    : self.misses,
+            "evictions" : self.evictions,
+            "entries"   : len(self.entries),
+            "bytes"     : self.bytes,
+            "budget"    : self.budget,
+            }
+
+# default budget: 64 MB
+_CACHE = _bitmapCache(64*1024*1024)
+
+# set the cache memory budget in bytes
+def cacheBudget(nbytes):
+    _CACHE.SetBudget(nbytes)
+    return
+
+# get the cache statistics (hits, misses, bytes, ...)
+def cacheStats():
+    return _CACHE.Stats()
+
+# empty the cache
+def cacheClear():
+    _CACHE.Clear()
+    _DIGESTS.clear()
+    return
+
+# get the decoded bitmap of a sheet (png file)
+# (loader is used instead of reading the png file)
+def _loadsheet(filepath, stamp, loader = None):
+
+    # the file stamp is part of the key so that
+    # an edited sheet is decoded again
+    key = "sheet", filepath, stamp
+    bm = _CACHE.Get(key)
+
+    # decode and record
+    if bm is None:
+        if loader: bm = loader()
+        else: bm = wxBitmap(filepath, wxBITMAP_TYPE_PNG)
+        _CACHE.Put(key, bm)
 
     # done
-    return collection
+    return bm
 
-# extract and collect bitmaps from a png file
-def imageCollect(name, *args):
+# get a clipped image from a sheet
+def _clipsheet(filepath, stamp, bm, x, y, w, h):
 
-    # check image filepath
+    key = "clip", filepath, stamp, x, y, w, h
+    image = _CACHE.Get(key)
+
+    # clip, share identical content and record (the
+    # cache only ever holds the shared bitmap: a clip
+    # identical to a recorded one is released at once)
+    if image is None:
+        image = bm.GetSubBitmap(wxRect(x, y, w, h))
+        image = _CACHE.Put(key, _sharecontent(image))
+
+    # done
+    return image
+
+############################################ PRELOAD
+
+# The sheets can be decoded in advance from a pool of
+# worker threads: the png files are decoded into wx
+# images by the workers and only the conversion of the
+# images into native bitmaps is done by the main thread.
+# The bitmaps are recorded into the cache from where
+# imageCollect takes them (the cache budget must be
+# large enough to hold all the preloaded sheets).
+
+# read a manifest: one sheet name per line
+def _readmanifest(filepath):
+    names = []
+    with open(filepath) as f:
+        for l in f.read().split('\n'):
+            l = l.strip()
+            if not l: continue              # skip empty line
+            if l[0] == '#': continue        # skip comment
+            names.append(l)
+    return names
+
+# get the source of a sheet: key, stamp, decoder and loader
+def _preloadsource(name):
+
+    # sheet from bundle
+    bundle = _findbundle(name)
+    if bundle:
+        fp, stamp = bundle.Key(name)
+        # decoded pixels: nothing to decode
+        if bundle.HasPixels(name):
+            return fp, stamp, None, lambda i: bundle.Bitmap(name)
+        return fp, stamp, lambda: bundle.Image(name), wxBitmap
+
+    # sheet from file
     fp = _findpath(f'{name}.png')
-    if _DEBUG: print(f"filepath {fp}")
     if not fp: return None
+    decode = lambda: wxImage(fp, wxBITMAP_TYPE_PNG)
+    return fp, _stamp(fp), decode, wxBitmap
+
+# preload a list of sheets (or a manifest file)
+# must be called from the main thread
+def imagePreload(names, threads = None):
+
+    # get names from manifest
+    if isinstance(names, str):
+        names = _readmanifest(names)
+
+    # collect sheets that are not yet cached
+    sources = []
+    for n in names:
+        source = _preloadsource(n)
+        if source is None: continue
+        fp, stamp, decode, convert = source
+        if ("sheet", fp, stamp) in _CACHE.entries: continue
+        sources.append(source)
+
+    # nothing to do
+    if not sources: return
+
+    # decode the png files in parallel
+    if threads is None: threads = min(8, cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers = threads) as pool:
+        futures = []
+        for fp, stamp, decode, convert in sources:
+            if decode: futures.append(pool.submit(decode))
+            else: futures.append(None)
+
+        # convert to bitmaps on the main thread
+        # (in the order of the list)
+        for source, future in zip(sources, futures):
+            fp, stamp, decode, convert = source
+            image = future.result() if future else None
+            _loadsheet(fp, stamp, lambda: convert(image))
+
+    # done
+    return
+
+############################################ HANDLES
+
+# The images returned by imageCollect are lightweight
+# handles: they only record the sheet and the clipping
+# rectangle. The native sub-bitmap is created the first
+# time it is required: when the image is painted or when
+# any wx.Bitmap method is called on the handle (except
+# for the size methods that are answered from the clip
+# geometry). Use imageBitmap() to get the native bitmap
+# required by the wx drawing methods.
+
+class imageHandle():
+
+    def __init__(self, filepath, stamp, sheet, x, y, w, h):
+        # sheet data
+        self.filepath = filepath
+        self.stamp = stamp
+        self.sheet = sheet
+        # clipping geometry
+        self.clip = x, y, w, h
+        # native bitmap (created on demand)
+        self.bitmap = None
+        return
+
+    def GetBitmap(self):
+        if self.bitmap is None:
+            self.bitmap = _clipsheet(
+                self.filepath, self.stamp, self.sheet, *self.clip)
+        return self.bitmap
+
+    def GetSize(self):
+        x, y, w, h = self.clip
+        return wxSize(w, h)
+
+    def GetWidth(self):
+        return self.clip[2]
+
+    def GetHeight(self):
+        return self.clip[3]
+
+    def IsOk(self):
+        return self.sheet.IsOk()
+
+    # any other attribute is taken from the native bitmap
+    def __getattr__(self, name):
+        return getattr(self.GetBitmap(), name)
+
+############################################ DEDUPLICATION
+
+# Identical clips share a single handle, hence a single
+# native bitmap: the handles are interned on their sheet
+# and clipping geometry for as long as they are in use.
+# Optionally (see imageDedup), the content of the clipped
+# bitmaps is also hashed so that identical images clipped
+# from different places share a single native bitmap.
+
+# handles in use: {(filepath, stamp, x, y, w, h): handle}
+_HANDLES = WeakValueDictionary()
+
+# content deduplication: {digest: bitmap}
+# (bitmaps in use only: the shared bitmaps are kept
+# by the cache and the handles, not by the digests)
+_DEDUP_CONTENT = False
+_DIGESTS = WeakValueDictionary()
+
+# deduplication statistics
+_DUPLICATES = {"geometry": 0, "content": 0, "bytes": 0}
+
+# enable/disable the content deduplication
+def imageDedup(content):
+    global _DEDUP_CONTENT
+    _DEDUP_CONTENT = bool(content)
+    if not _DEDUP_CONTENT: _DIGESTS.clear()
+    return
+
+# get the deduplication statistics:
+# "geometry": clips served by an existing handle
+# "content": bitmaps replaced by an identical one
+# "bytes": native bitmap bytes released by "content"
+# (a handle reuse creates no bitmap: no bytes counted)
+def dedupStats():
+    return dict(_DUPLICATES, handles = len(_HANDLES))
+
+# get the (shared) handle of a clip
+def _handle(filepath, stamp, sheet, x, y, w, h):
+    key = filepath, stamp, x, y, w, h
+    image = _HANDLES.get(key)
+    if image is None:
+        image = imageHandle(filepath, stamp, sheet, x, y, w, h)
+        _HANDLES[key] = image
+    else:
+        _DUPLICATES["geometry"] += 1
+    return image
+
+# get the bitmap of identical content if any
+def _sharecontent(bitmap):
+    if not _DEDUP_CONTENT: return bitmap
+    # hash the pixels (and the size)
+    img = bitmap.ConvertToImage()
+    w, h = img.GetSize()
+    digest = blake2b(bytes(img.GetData()), digest_size = 16)
+    if img.HasAlpha(): digest.update(bytes(img.GetAlpha()))
+    digest.update(f"{w}x{h}".encode())
+    key = digest.digest()
+    # share or record
+    shared = _DIGESTS.get(key)
+    if shared is not None:
+        _DUPLICATES["content"] += 1
+        _DUPLICATES["bytes"] += 4*w*h
+        return shared
+    _DIGESTS[key] = bitmap
+    return bitmap
+
+############################################ ATLAS
+
+# A list of images clipped from the same sheet can be
+# used in the atlas form: a single reference to the
+# sheet bitmap and the table of the clipping rectangles.
+# The images are then drawn by copying the rectangles
+# directly from the sheet: no native sub-bitmap is
+# ever created.
+
+# get the atlas form of a list of images: (sheet, rects)
+# (None if the images are not all from the same sheet)
+def imageAtlas(images):
+    if not images: return None
+    sheet, rects = None, []
+    for i in images:
+        if not isinstance(i, imageHandle): return None
+        if sheet is None: sheet = i.sheet
+        if i.sheet is not sheet: return None
+        rects.append(i.clip)
+    return sheet, rects
+
+# draw the image "n" of an atlas at position (x, y)
+def atlasDraw(dc, atlas, n, x, y):
+    sheet, rects = atlas
+    X, Y, w, h = rects[n]
+    # the sheet is selected only for the copy
+    # so that it remains available for clipping
+    src = wxMemoryDC()
+    src.SelectObjectAsSource(sheet)
+    dc.Blit(x, y, w, h, src, X, Y, useMask = True)
+    src.SelectObject(wxNullBitmap)
+    return
+
+############################################ SCALING
+
+# On high resolution displays the windows have a content
+# scale factor larger than one. The images are then drawn
+# using variants resampled (once) to the display scale.
+# The variants are given the scale factor so that their
+# logical size is the size of the original image: the
+# layout is unchanged. This requires a wx version that
+# provides wx.Bitmap.SetScaleFactor(), otherwise the
+# original images are drawn.
+
+_SCALABLE = hasattr(wxBitmap, "SetScaleFactor")
+
+# variants: {scale: {key: (image, bitmap)}}
+_SCALED = {}
+
+# key of an image for the variants cache
+def _scalekey(image):
+    if isinstance(image, imageHandle):
+        return image.filepath, image.stamp, image.clip
+    # plain bitmaps are identified by their id
+    # (the bitmap is kept with the variant so that
+    # the id remains valid). A plain bitmap that is
+    # modified or dropped must be given to scaleDrop()
+    return id(image)
+
+# get the variant of an image for a scale factor
+def imageScaled(image, scale):
+
+    # no variant required (or supported)
+    if scale == 1.0 or not _SCALABLE:
+        return imageBitmap(image)
+
+    variants = _SCALED.setdefault(scale, {})
+    key = _scalekey(image)
+
+    # resample and record
+    if key not in variants:
+        img = imageBitmap(image).ConvertToImage()
+        w, h = img.GetSize()
+        W, H = max(1, round(w*scale)), max(1, round(h*scale))
+        bitmap = wxBitmap(img.Scale(W, H, wxIMAGE_QUALITY_HIGH))
+        bitmap.SetScaleFactor(scale)
+        variants[key] = image, bitmap
+
+    # done
+    image, bitmap = variants[key]
+    return bitmap
+
+# drop the variants of one scale (or of all scales)
+def scaleEvict(scale = None):
+    if scale is None: _SCALED.clear()
+    else: _SCALED.pop(scale, None)
+    return
+
+# drop the variants of one image (all scales): used for
+# plain bitmaps that are drawn into (the variants would
+# be outdated) or replaced (the variants would be kept)
+def scaleDrop(image):
+    key = _scalekey(image)
+    for variants in _SCALED.values():
+        variants.pop(key, None)
+    return
+
+# get the native bitmap of an image (handle or bitmap)
+# to be drawn in a window of the given scale factor
+def imageBitmap(image, scale = 1.0):
+    if scale != 1.0:
+        return imageScaled(image, scale)
+    if isinstance(image, imageHandle):
+        return image.GetBitmap()
+    return image
+
+# extract and collect bitmaps from a png file
+def imageCollect(name, *args):
+
+    # load the sheet from a bundle (or get it from the cache)
+    bundle = _findbundle(name)
+    if bundle:
+        fp, stamp = bundle.Key(name)
+        bm = _loadsheet(fp, stamp, lambda: bundle.Bitmap(name))
+
+    else:
+        # check image filepath
+        fp = _findpath(f'{name}.png')
+        if _DEBUG: print(f"filepath {fp}")
+        if not fp: return None
+
+        # load the bitmap file (or get it from the cache)
+        stamp = _stamp(fp)
+        bm = _loadsheet(fp, stamp)
 
-    # load the bitmap file
-    bm = wxBitmap(fp, wxBITMAP_TYPE_PNG)
     if _DEBUG: print(f"bitmap {bm}")
 
     # get image data from .txt file
@@ -199,6 +1001,9 @@ def imageCollect(name, *args):
     if _DEBUG: print(f"collection {collection}")
     if not collection: return None
 
+    # get sheet size
+    W, H = bm.GetSize()
+
     # clip images from the bitmap file
     # and add them to the collection
     images, taglists = [], []
@@ -208,7 +1013,6 @@ def imageCollect(name, *args):
         offset, grid, size, position = geometry        
 
         # get parameters
-        W, H = bm.GetSize()
         X, Y = offset
         p, q = grid
         w, h = size
@@ -221,11 +1025,8 @@ def imageCollect(name, *args):
         x = (m-1)*P + (P-w)/2 + X
         y = (n-1)*Q + (Q-h)/2 + Y
         
-        # set clipping geometry
-        Clip = wxRect(int(x), int(y), w, h)
-        
-        # clip and record
-        images.append(bm.GetSubBitmap(Clip))
+        # record the clipping (the native bitmap is clipped on demand)
+        images.append(_handle(fp, stamp, bm, int(x), int(y), w, h))
         taglists.append(taglist)
 
     # one image in the list: return a single image
@@ -233,14 +1034,75 @@ def imageCollect(name, *args):
         return images[0]
 
     # more than one image: return (image, tags) list
-    subCollection = []
-    # make image list
-    for i, t in zip(images, taglists):
-        subCollection.append((i, t))
+    # (the collection carries its own tags index)
+    subCollection = _collection(zip(images, taglists))
 
     # done
     return subCollection
 
+############################################ TINT
+
+# Colour variants of an image are derived from a single
+# base image (a white, grey or mask sprite) by scaling
+# the red, green and blue channels of all the pixels by
+# the colour components. The variants are cached by
+# image and colour. imageSelect() derives the variant
+# automatically when a colour name (or "#rrggbb") is
+# requested that is not a tag of the collection, using
+# the images tagged with one of the _TINT_BASES tags.
+
+_TINT_BASES = ["mask", "white", "grey"]
+
+# variants: {(key, rgb): (image, bitmap)}
+_TINTED = {}
+
+# get the (r, g, b) components of a colour (None if invalid)
+def _colour(colour):
+    if isinstance(colour, str):
+        c = wxColour()
+        if not c.Set(colour): return None
+        colour = c
+    if isinstance(colour, wxColour):
+        return colour.Red(), colour.Green(), colour.Blue()
+    r, g, b = colour[:3]
+    return r, g, b
+
+# get the colour variant of an image
+def imageTint(image, colour):
+
+    # get colour components
+    rgb = _colour(colour)
+    if rgb is None: return None
+    key = _scalekey(image), rgb
+
+    # tint and record
+    if key not in _TINTED:
+        img = imageBitmap(image).ConvertToImage()
+        r, g, b = rgb
+        img = img.AdjustChannels(r/255, g/255, b/255, 1.0)
+        _TINTED[key] = image, wxBitmap(img)
+
+    # done
+    image, bitmap = _TINTED[key]
+    return bitmap
+
+# replace a missing colour tag by a tint base tag
+def _tintargs(tagindex, args):
+    for i, a in enumerate(args):
+        # known tags are not colours
+        if a in tagindex: continue
+        if not isinstance(a, str): continue
+        # check the colour
+        if _colour(a) is None: continue
+        # find a base
+        for base in _TINT_BASES:
+            if base in tagindex:
+                args = args[:i] + [base] + args[i+1:]
+                return args, a
+        # no base
+        break
+    return args, None
+
 ############################################ SELECT
 
 def imageSelect(collection, *args):
@@ -257,45 +1119,54 @@ def imageSelect(collection, *args):
         if isinstance(args[-1], list):
             sortlist = args.pop()
 
-    subCollection = []
-
-    # filter images collection
-    for image, taglist in collection:
-
-        valid = True
-        for a in args:
-            if a not in taglist:
-                valid = False
+    # get the tags index of the collection
+    # (built here for plain lists of pairs)
+    if isinstance(collection, _collection):
+        tagindex = collection.tagindex
+    else:
+        tagindex = _tagindex([t for i, t in collection])
 
-        if valid:
-            
-            # the taglist object must be
-            # left unchanged so that the
-            # collection object keeps its
-            # integrity
-            tagsublist = taglist.copy()
+    # derive a missing colour from a base image
+    args, tint = _tintargs(tagindex, args)
 
-            for a in args:
-                tagsublist.remove(a)
+    # filter images collection
+    positions = _tagfilter(tagindex, len(collection), args)
 
-            subCollection.append((image, tagsublist))
+    subCollection = [collection[p] for p in positions]
 
     images = []
 
     # return an image list in the
     # order given by sortlist
     if sortlist:
+        # the selected positions in collection order
+        selected = set(positions)
         for a in sortlist:
-            for i, t in subCollection:
-                if a in t:
-                    images.append(i)
+            # positions selected and tagged with "a"
+            found = selected & tagindex.get(a, set())
+            for p in sorted(found):
+                image, taglist = collection[p]
+                # a filter tag is not part of the
+                # image name unless it is repeated
+                if a in args:
+                    if taglist.count(a) <= args.count(a):
+                        continue
+                images.append(image)
+
+    else:
+        # build image list
+        for i, t in subCollection:
+            images.append(i)
+
+    # colour variants
+    if tint:
+        images = [imageTint(i, tint) for i in images]
+
+    # the sortlist order is always returned as a list
+    if sortlist:
         # done
         return images
 
-    # build image list
-    for i, t in subCollection:
-        images.append(i)
-
     # one image in the list: return a single image
     if len(images) == 1:
         return images[0]
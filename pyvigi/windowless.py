@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+# file: windowless.py
+# content: windowless controls painted by the panel
+# created: 2026 October 18
+# modified:
+# modification:
+# author: roch schanen
+# repository: https://github.com/RochSchanen/pyvigi_dev
+# comment:
+
+# constants, methods and classes are imported individually
+# this allows to identify clearly the packages usage
+
+# from wxpython: https://www.wxpython.org/
+
+# wx geometry
+from wx import Rect                 as wxRect
+
+# wx event methods
+from wx import PostEvent            as wxPostEvent
+from wx.lib.newevent import NewEvent as wxNewEvent
+
+# from this package
+from pyvigi.display import _imageStates
+from pyvigi.theme import imageBitmap
+from pyvigi.base import scheduleRefresh
+from pyvigi.buttons import _switchBehaviour
+from pyvigi.buttons import _ledSwitchBehaviour
+from pyvigi.buttons import _wheelBehaviour
+
+"""
+
+    Windowless controls are plain python objects: they
+    are not native windows. They are registered to the
+    panel of the app (their parent) which paints them
+    all in a single pass after its background and which
+    routes the mouse events to the control found under
+    the mouse pointer.
+
+    A panel full of leds and digits is then a single
+    native window. The controls keep the usual methods:
+    SetValue(), GetValue(), BindEvent(), SetPosition(),
+    GetSize(), ... and can be placed with layout.Group.
+
+    The parent must be the app panel (base._basePanel).
+
+"""
+
+########################################################### WINDOWLESSCONTROL
+
+class windowlessControl():
+
+    def __init__(self, parent):
+
+        # parameters
+        self.parent = parent
+
+        # geometry
+        self.x, self.y = 0, 0
+        self.w, self.h = 0, 0
+        self.shown = True
+
+        # status is the value returned
+        # by SendEvent to owner class
+        self.status = None
+
+        # event builder (see BindEvent)
+        self.ctr, self.evt = None, None
+
+        # register to the parent panel
+        parent.AddWidget(self)
+
+        # done
+        return
+
+    # geometry
+
+    def GetParent(self):
+        return self.parent
+
+    def SetPosition(self, position):
+        # refresh the old and the new areas
+        self.Refresh()
+        self.x, self.y = position
+        self.Refresh()
+        return
+
+    def GetPosition(self):
+        return (self.x, self.y)
+
+    def SetSize(self, size):
+        self.Refresh()
+        self.w, self.h = size
+        self.Refresh()
+        return
+
+    def GetSize(self):
+        return (self.w, self.h)
+
+    def GetRect(self):
+        return wxRect(int(self.x), int(self.y), self.w, self.h)
+
+    def HitTest(self, x, y):
+        return (self.x <= x < self.x + self.w
+            and self.y <= y < self.y + self.h)
+
+    def Show(self, show = True):
+        if self.shown != bool(show):
+            self.shown = bool(show)
+            self.Refresh()
+        return
+
+    def Hide(self):
+        self.Show(False)
+        return
+
+    def IsShown(self):
+        return self.shown
+
+    def GetContentScaleFactor(self):
+        return self.parent.GetContentScaleFactor()
+
+    def Destroy(self):
+        self.Refresh()
+        self.parent.RemoveWidget(self)
+        return
+
+    # painting
+
+    # invalidate the control area of the parent
+    def Refresh(self):
+        if self.w and self.h:
+            self.parent.RefreshRect(self.GetRect(), False)
+        return
+
+    # to be overloaded: draw the control at its position
+    def Draw(self, dc):
+        pass
+
+    # events
+
+    def BindEvent(self, handler):
+        self.ctr, self.evt = wxNewEvent()
+        self.parent.Bind(self.evt, handler)
+        return
+
+    def SendEvent(self):
+        if self.ctr:
+            event = self.ctr(caller = self, status = self.status)
+            wxPostEvent(self.parent, event)
+        return
+
+    # mouse events routed by the parent (to be overloaded)
+
+    def _onMouseDown(self, event):
+        pass
+
+    def _onMouseUp(self, event):
+        pass
+
+    def _onMouseEnter(self, event):
+        pass
+
+    def _onMouseLeave(self, event):
+        pass
+
+    def _onMouseWheel(self, event):
+        pass
+
+############################################################ WINDOWLESSBITMAP
+
+# windowless version of display.bitmapControl
+
+class windowlessBitmap(windowlessControl, _imageStates):
+
+    def __init__(
+        self,
+        parent,
+        images,
+        names = None):
+
+        windowlessControl.__init__(self, parent)
+
+        # images and status
+        self.w, self.h = self._SetImages(images, names)
+
+        # call child _start() method
+        self._start()
+
+        # done
+        return
+
+    def _start(self):
+        # to overload
+        pass
+
+    def Draw(self, dc):
+        s = self.GetContentScaleFactor()
+        self._DrawStatus(dc, int(self.x), int(self.y), s)
+        return
+
+    def SetValue(self, Value):
+        # refreshed on the next frame
+        if self._SetStatus(Value):
+            scheduleRefresh(self)
+        return
+
+    def GetValue(self):
+        return self.status
+
+################################################################ BUTTONS
+
+# windowless versions of the buttons.py controls
+# (see buttons.py for the images order and behaviour)
+
+class windowlessSwitch(_switchBehaviour, windowlessBitmap):
+
+    def _start(self):
+        self.radio = None
+        return
+
+class windowlessLEDSwitch(_ledSwitchBehaviour, windowlessBitmap):
+
+    def _start(self):
+        self.radio = None
+        self.lock = False
+        return
+
+class windowlessWheel(_wheelBehaviour, windowlessBitmap):
+
+    def __init__(
+        self,
+        parent,
+        images,
+        hover = None):
+
+        # concatenate hover images
+        images = self._HoverImages(images, hover)
+
+        windowlessBitmap.__init__(self, parent, images)
+
+        # LOCALS
+        self._WheelStart(len(images))
+        return
+
+################################################################ DISPLAY
+
+# windowless version of display.digitalFixedPointDisplay
+
+class windowlessFixedPointDisplay(windowlessControl):
+
+    def __init__(
+        self,
+        parent,         # parent
+        FORMAT,         # display format
+        imgs,           # digits and symbols images
+        names):         # digits and symbols names
+
+        windowlessControl.__init__(self, parent)
+
+        # parameters
+        self.FORMAT = FORMAT
+        self.glyphs = dict(zip(names, imgs))
+
+        # status is a list of image names,
+        # one name for each digit and the dot
+        self.value  = 0
+        self.status = list(f"{0:{FORMAT}}")
+
+        # cells geometry (position, width)
+        self.cells, X, H = [], 0, 0
+        for s in self.status:
+            w, h = self.glyphs[s].GetSize()
+            self.cells.append((X, w))
+            if H < h: H = h
+            X += w
+        self.w, self.h = X, H
+
+        # done
+        return
+
+    def Draw(self, dc):
+        s = self.GetContentScaleFactor()
+        for (X, w), c in zip(self.cells, self.status):
+            # clip to the cell
+            dc.SetClippingRegion(int(self.x) + X, int(self.y), w, self.h)
+            dc.DrawBitmap(imageBitmap(self.glyphs[c], s),
+                int(self.x) + X, int(self.y))
+            dc.DestroyClippingRegion()
+        return
+
+    def SetValue(self, value):
+        self.value = value
+        status = list(f"{value:{self.FORMAT}}")
+        if status == self.status: return
+        self.status = status
+        scheduleRefresh(self)
+        return
+
+    def GetValue(self):
+        return self.value
+
+if __name__ == "__main__":
+
+    from pyvigi.tools import header
+    header()
+
+    from sys import version
+    print(f"run Python version {version.split(' ')[0]}")
+
+    from pyvigi import version
+    print(f"using pyvigi version {version}")
+
+    from pyvigi.base import app
+    from pyvigi.theme import imageCollect
+    from pyvigi.theme import imageSelect
+    from pyvigi.timer import timeloop
+
+    # derive a new class from app
+    class myapp(app):
+
+        def Start(self):
+
+            # manually setup the background image of myapp
+            PANELS = imageCollect("panels")
+            self.Panel.BackgroundBitmap = imageSelect(PANELS, "medium")
+
+            # a grid of windowless leds
+            LEDS = imageCollect("leds", "green")
+            self.leds = []
+            for i in range(10):
+                for j in range(10):
+                    l = windowlessBitmap(self.Panel, imageSelect(LEDS))
+                    l.SetPosition((20+20*i, 20+20*j))
+                    self.leds.append(l)
+
+            # a windowless switch
+            SWITCHES = imageCollect("switches")
+            s = windowlessLEDSwitch(self.Panel,
+                imageSelect(SWITCHES, "green"))
+            s.SetPosition((240, 20))
+            s.BindEvent(self.updateSwitch)
+
+            # blink
+            self.n = 0
+            timeloop(self, self.update, 50)
+            return
+
+        def update(self, event):
+            l = self.leds[self.n % len(self.leds)]
+            l.SetValue(l.GetValue()^1)
+            self.n += 1
+            return
+
+        def updateSwitch(self, event):
+            print(event.status)
+            return
+
+    # instanciate myapp
+    m = myapp()
+
+    # run myapp
+    m.Run()